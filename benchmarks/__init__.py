@@ -0,0 +1 @@
+"""Timing benchmarks for the analysis sections; see benchmarks/run.py."""
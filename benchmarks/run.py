@@ -0,0 +1,191 @@
+"""Benchmarks for the analysis sections.
+
+    python -m benchmarks.run sections [--data-dir data] [--only fossils,tech]
+    python -m benchmarks.run pbdb [--rows 100k,1M,10M,50M] [--work-dir DIR]
+    python -m benchmarks.run redshift [--points 1000,100000,1000000]
+
+Every figure is rendered headless into a scratch directory. Each section is
+timed in three parts: `load` (reading its datasets through the registry),
+`build` (the section body: transforms and plot calls) and `render`
+(savefig, where matplotlib actually draws). `pbdb` runs the fossils and
+extinctions sections on synthetic occurrence tables, first with a cold
+column cache and then a warm one; `redshift` draws the SFR and supernova
+curves on dense grids. --json writes the rows for comparing runs.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from cosmic_history.datasets import DatasetRegistry  # noqa: E402
+from cosmic_history.pbdb import PBDB_FILE  # noqa: E402
+from cosmic_history.render import RENDER_LOG, finish_figure, set_batch_mode  # noqa: E402
+from cosmic_history.sections import SECTIONS, parse_names, select  # noqa: E402
+from cosmic_history.writer import WRITER  # noqa: E402
+
+from benchmarks import synthetic  # noqa: E402
+
+PBDB_SECTIONS = ['fossils', 'extinctions']
+
+
+def time_section(s, registry):
+    """{'load', 'build', 'render'} seconds for one section on a freshly cleared registry."""
+    registry.clear()
+    logged = len(RENDER_LOG)
+    start = time.perf_counter()
+    for name in s.inputs:
+        registry.get(name)
+    loaded = time.perf_counter()
+    s(registry)
+    done = time.perf_counter()
+    render = sum(seconds for _, seconds in RENDER_LOG[logged:])
+    return {'section': s.name, 'load': loaded - start, 'build': done - loaded - render,
+            'render': render, 'figures': len(RENDER_LOG) - logged}
+
+
+@contextmanager
+def _scratch(data_dir=None):
+    # Sections write figures into the working directory and some outputs
+    # under data/, so run them from a scratch directory that links to data_dir;
+    # it is removed, figures and all, once the block is done
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='cosmic_bench_') as work:
+        if data_dir:
+            os.symlink(os.path.abspath(data_dir), os.path.join(work, 'data'))
+        os.chdir(work)
+        try:
+            yield work
+        finally:
+            WRITER.flush()
+            os.chdir(cwd)
+
+
+def bench_sections(data_dir, only=None, skip=None):
+    import cosmic_history_analysis  # noqa: F401  registers the sections
+    registry = DatasetRegistry(os.path.abspath(data_dir))
+    with _scratch(data_dir):
+        return [time_section(s, registry) for s in select(only, skip)]
+
+
+def bench_pbdb(sizes, work_dir=None, seed=0):
+    import cosmic_history_analysis  # noqa: F401
+    os.environ.pop('PBDB_SYNC', None)
+    work_dir = os.path.abspath(work_dir or os.path.join(tempfile.gettempdir(), 'cosmic_bench_pbdb'))
+    rows = []
+    for size in sizes:
+        n_rows = synthetic.parse_size(size)
+        data_dir = os.path.join(work_dir, size)
+        start = time.perf_counter()
+        synthetic.write_pbdb_csv(os.path.join(data_dir, PBDB_FILE), n_rows, seed)
+        print(f"{size}: synthetic table ready in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        cache_dir = os.path.join(data_dir, '.pbdb_cache')
+        registry = DatasetRegistry(data_dir)
+        with _scratch(data_dir):
+            for cache in ('cold', 'warm'):
+                for name in PBDB_SECTIONS:
+                    # Both sections read min_ma/max_ma, so each cold row starts from an empty cache
+                    if cache == 'cold':
+                        shutil.rmtree(cache_dir, ignore_errors=True)
+                    row = time_section(SECTIONS[name], registry)
+                    row.update(rows=n_rows, cache=cache)
+                    rows.append(row)
+    return rows
+
+
+def _plot_sfr(grid):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(12, 7), dpi=200)
+    plt.plot(grid['z'], grid['SFRD'], color='tab:blue', linewidth=2)
+    plt.yscale('log')
+    plt.xlim(0, grid['z'].iloc[-1])
+    plt.grid(True, which='both', linestyle='--', alpha=0.5)
+    plt.tight_layout()
+    finish_figure('sfr_dense.png')
+
+
+def _plot_supernova(grid):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(10, 6))
+    plt.plot(grid['z'], grid['Rate_CCSN'], linestyle='-', label='CCSN')
+    plt.plot(grid['z'], grid['Rate_Ia'], linestyle='--', label='Ia')
+    plt.legend()
+    plt.grid(True)
+    finish_figure('supernova_dense.png')
+
+
+def bench_redshift(points):
+    rows = []
+    with _scratch():
+        for n in points:
+            for name, plot in (('sfr', _plot_sfr), ('supernova', _plot_supernova)):
+                logged = len(RENDER_LOG)
+                start = time.perf_counter()
+                grid = synthetic.redshift_grid(n)
+                built = time.perf_counter()
+                plot(grid)
+                done = time.perf_counter()
+                render = sum(seconds for _, seconds in RENDER_LOG[logged:])
+                rows.append({'section': name, 'points': n, 'load': built - start,
+                             'build': done - built - render, 'render': render, 'figures': 1})
+    return rows
+
+
+def format_rows(rows):
+    extra = [k for k in ('rows', 'points', 'cache') if any(k in r for r in rows)]
+    header = (f"{'section':<16}" + ''.join(f"{k:>10}" for k in extra)
+              + ''.join(f"{k:>10}" for k in ('load', 'build', 'render', 'total')))
+    lines = [header]
+    for r in rows:
+        total = r['load'] + r['build'] + r['render']
+        lines.append(f"{r['section']:<16}" + ''.join(f"{str(r.get(k, '')):>10}" for k in extra)
+                     + ''.join(f"{r[k] * 1000:8.1f}ms" for k in ('load', 'build', 'render'))
+                     + f"{total * 1000:8.1f}ms")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='suite', required=True)
+    p = sub.add_parser('sections', help='every registered section on the real data')
+    p.add_argument('--data-dir', default=os.path.join(REPO_DIR, 'data'))
+    p.add_argument('--only', type=parse_names)
+    p.add_argument('--skip', type=parse_names)
+    p = sub.add_parser('pbdb', help='fossils/extinctions on synthetic PBDB tables')
+    p.add_argument('--rows', type=parse_names, default=['100k', '1M'],
+                   help=f"sizes, e.g. {','.join(synthetic.SIZES)}")
+    p.add_argument('--work-dir', help='where the synthetic tables are kept between runs')
+    p.add_argument('--seed', type=int, default=0)
+    p = sub.add_parser('redshift', help='SFR/supernova curves on dense redshift grids')
+    p.add_argument('--points', type=lambda v: [int(float(x)) for x in parse_names(v)],
+                   default=[1_000, 100_000, 1_000_000])
+    for p in sub.choices.values():
+        p.add_argument('--json', help='also write the rows to this file')
+    args = parser.parse_args(argv)
+
+    set_batch_mode()
+    # Write figures inline, so each one's cost lands in the section that drew it
+    WRITER.configure(threads=0)
+    # Import up front so the first section timed doesn't pay for it
+    import matplotlib.pyplot  # noqa: F401
+    import pandas  # noqa: F401
+    if args.suite == 'sections':
+        rows = bench_sections(args.data_dir, args.only, args.skip)
+    elif args.suite == 'pbdb':
+        rows = bench_pbdb(args.rows, args.work_dir, args.seed)
+    else:
+        rows = bench_redshift(args.points)
+    print('\n'.join(format_rows(rows)))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Synthetic inputs for the benchmarks.
+
+PBDB-shaped occurrence tables (same header as a PBDB occurrence download,
+intervals and ages drawn from the ICS timescale, genus names with a long
+tail) and dense redshift grids for the SFR and supernova curves. Everything
+is generated from a seed, so runs at the same size are comparable.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cosmic_history.sfr import SFR_MODELS
+from cosmic_history.snrates import rate_table
+from cosmic_history.timescale import ICS
+
+PBDB_COLUMNS = ['occurrence_no', 'record_type', 'reid_no', 'flags', 'collection_no',
+                'identified_name', 'identified_rank', 'identified_no', 'difference',
+                'accepted_name', 'accepted_attr', 'accepted_rank', 'accepted_no',
+                'early_interval', 'late_interval', 'max_ma', 'min_ma', 'reference_no']
+
+# Benchmark sizes; the two large ones are written to disk chunk by chunk
+SIZES = {'100k': 100_000, '1M': 1_000_000, '10M': 10_000_000, '50M': 50_000_000}
+
+GENERATE_CHUNK = 1_000_000
+
+
+def parse_size(value):
+    """'1M' / '250k' / '5000' -> rows."""
+    if value in SIZES:
+        return SIZES[value]
+    scale = {'k': 1_000, 'M': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('kM')) * scale)
+
+
+def _interval_pool():
+    # Mostly stages, as in PBDB, with some epochs and periods recorded at coarser resolution
+    table = ICS.table[ICS.table['max_ma'] <= 541]
+    weights = table['rank'].map({'age': 8.0, 'epoch': 2.0, 'period': 1.0}).fillna(0.5).to_numpy()
+    return table, weights / weights.sum()
+
+
+def occurrence_chunk(n_rows, start=0, seed=0, n_taxa=None):
+    """One block of `n_rows` synthetic occurrences, numbered from `start`."""
+    rng = np.random.default_rng([seed, start])
+    table, weights = _interval_pool()
+    n_taxa = n_taxa or max(1000, n_rows // 50)
+
+    unit = rng.choice(len(table), size=n_rows, p=weights)
+    max_ma = table['max_ma'].to_numpy()[unit]
+    min_ma = table['min_ma'].to_numpy()[unit]
+    names = table.index.to_numpy()
+    # ~15% span two units: the late interval is a younger unit and sets min_ma
+    spans = rng.random(n_rows) < 0.15
+    younger = rng.choice(len(table), size=n_rows, p=weights)
+    spans &= table['max_ma'].to_numpy()[younger] < max_ma
+    late = np.where(spans, names[younger], '')
+    min_ma = np.where(spans, table['min_ma'].to_numpy()[younger], min_ma)
+
+    # Zipf-like taxon frequencies, like real collections
+    taxon = np.minimum(rng.zipf(1.3, size=n_rows), n_taxa) - 1
+    genus = np.char.add('Genus', taxon.astype(str))
+    species = rng.random(n_rows) < 0.6
+    return pd.DataFrame({
+        'occurrence_no': np.arange(start + 1, start + n_rows + 1),
+        'record_type': 'occ',
+        'reid_no': '',
+        'flags': '',
+        'collection_no': rng.integers(1, max(2, n_rows // 20), size=n_rows),
+        'identified_name': np.where(species, np.char.add(genus, ' sp.'), genus),
+        'identified_rank': np.where(species, 'species', 'genus'),
+        'identified_no': taxon + 1,
+        'difference': '',
+        'accepted_name': genus,
+        'accepted_attr': '',
+        'accepted_rank': 'genus',
+        'accepted_no': taxon + 1,
+        'early_interval': names[unit],
+        'late_interval': late,
+        'max_ma': max_ma,
+        'min_ma': min_ma,
+        'reference_no': rng.integers(1, max(2, n_rows // 100), size=n_rows),
+    }, columns=PBDB_COLUMNS)
+
+
+def pbdb_occurrences(n_rows, seed=0):
+    """A synthetic occurrence table held in memory (use write_pbdb_csv for the large sizes)."""
+    chunks = [occurrence_chunk(min(GENERATE_CHUNK, n_rows - start), start, seed)
+              for start in range(0, n_rows, GENERATE_CHUNK)]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_pbdb_csv(path, n_rows, seed=0, chunk_rows=GENERATE_CHUNK):
+    """Stream `n_rows` synthetic occurrences to `path`; memory stays at one chunk.
+
+    An existing file with the same row count and seed is reused, so the 10M
+    and 50M tables are only written once.
+    """
+    marker = f"{path}.synthetic"
+    tag = f"{n_rows} {seed}"
+    if os.path.exists(path) and os.path.exists(marker):
+        with open(marker) as f:
+            if f.read() == tag:
+                return path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = occurrence_chunk(min(chunk_rows, n_rows - start), start, seed)
+            chunk.to_csv(f, index=False, header=start == 0)
+    with open(marker, 'w') as f:
+        f.write(tag)
+    return path
+
+
+def redshift_grid(n_points, z_max=10.0):
+    """Dense redshift grid with the SFR and supernova curves the sections plot.
+
+    SFRD is the Madau & Dickinson (2014) fit with their normalisation; the
+    supernova rates come from snrates.rate_table with the supernova
+    section's model and DTD, so the Ia column costs the same FFT convolution.
+    """
+    z = np.linspace(0, z_max, n_points)
+    sfrd = SFR_MODELS['madau'](z, a=0.015)
+    rates = rate_table(z, model='madau', dtd='power_law')
+    return pd.DataFrame({
+        'z': z,
+        'SFRD': sfrd,
+        'log_SFRD': np.log10(sfrd),
+        'Rate_CCSN': rates['Rate_CCSN'].to_numpy(),
+        'Rate_Ia': rates['Rate_Ia'].to_numpy(),
+    })
@@ -0,0 +1 @@
+"""Helpers shared by cosmic_history_analysis.py."""
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_categorical(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    return values.astype('category')
+
+
+def stage_counts(stages):
+    """Occurrences per stage, counted with one bincount over the categorical codes."""
+    stages = _as_categorical(stages)
+    codes = stages.cat.codes.to_numpy()
+    categories = stages.cat.categories
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    return pd.Series(counts, index=pd.Index(categories, name=stages.name), name='count')
+
+
+def period_stage_counts(stages, periods):
+    """Period x stage occurrence-count table built in a single pass.
+
+    `periods` is either a {stage: period} mapping, looked up once per
+    distinct stage name, or a per-row categorical of periods (see
+    timescale.Timescale.assign_periods), combined with the stage codes into
+    one bincount. Either way the rows are only touched once. Returns a Series
+    indexed by (period, stage), stages sorted by name within each period,
+    zero counts and rows without a period dropped.
+    """
+    if isinstance(periods, dict):
+        counts = stage_counts(stages)
+        period_names = counts.index.map(periods)
+        stage_names = counts.index
+        values = counts.to_numpy()
+        stage_label = counts.index.name
+    else:
+        stages = _as_categorical(stages)
+        periods = _as_categorical(pd.Series(periods))
+        s_codes = stages.cat.codes.to_numpy().astype(np.int64)
+        p_codes = periods.cat.codes.to_numpy().astype(np.int64)
+        n_stages, n_periods = len(stages.cat.categories), len(periods.cat.categories)
+        keep = (s_codes >= 0) & (p_codes >= 0)
+        flat = np.bincount(p_codes[keep] * n_stages + s_codes[keep], minlength=n_periods * n_stages)
+        p_idx, s_idx = np.divmod(np.arange(n_periods * n_stages), n_stages)
+        period_names = pd.Index(np.asarray(periods.cat.categories, dtype=object)[p_idx])
+        stage_names = pd.Index(np.asarray(stages.cat.categories, dtype=object)[s_idx])
+        values = flat
+        stage_label = stages.name
+    keep = (values > 0) & period_names.notna()
+    table = pd.Series(
+        values[keep],
+        index=pd.MultiIndex.from_arrays(
+            [period_names[keep], stage_names[keep]], names=['major_period', stage_label]),
+        name='count',
+    )
+    return table.sort_index()
@@ -0,0 +1,138 @@
+"""Friedmann-equation cosmology: age, redshift, scale factor and CMB temperature.
+
+The age t(a) is integrated once per parameter set on a fine ln a grid and
+kept as a read-only lookup table, so t(z), z(t), a(t) and T_CMB for
+millions of points cost one vectorized interpolation each. ln t is
+interpolated against ln a; both rise monotonically, so the same table
+answers the inverse questions.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+KM_PER_MPC = 3.0857e19
+SECONDS_PER_YEAR = 3.15576e7
+SECONDS_PER_GYR = SECONDS_PER_YEAR * 1e9
+# Photon density today is Ω_γ h² = 2.4728e-5 (T_CMB0 / 2.7255 K)⁴
+PHOTON_DENSITY_H2 = 2.4728e-5
+# Each massless neutrino species adds 7/8 (4/11)^(4/3) of the photon density
+NEUTRINO_PER_SPECIES = 7 / 8 * (4 / 11)**(4 / 3)
+
+# ln a range of the age table: z up to ~10¹⁰, a up to 100 (well into the future)
+LN_A_MIN = -23.0
+LN_A_MAX = np.log(100.0)
+TABLE_POINTS = 40001
+
+
+class Cosmology:
+    """A Friedmann-Lemaître-Robertson-Walker universe with matter, radiation and Λ.
+
+    Ode0 defaults to whatever makes the universe flat; any remainder is
+    curvature. Neutrinos are treated as massless radiation and Tcmb0=0
+    leaves radiation out entirely. Ages are in Gyr, H in km/s/Mpc.
+    """
+
+    def __init__(self, H0, Om0, Tcmb0=2.7255, Neff=3.046, Ode0=None, name=None):
+        self.H0 = float(H0)
+        self.Om0 = float(Om0)
+        self.Tcmb0 = float(Tcmb0)
+        self.Neff = float(Neff)
+        h = self.H0 / 100
+        self.Or0 = PHOTON_DENSITY_H2 * (self.Tcmb0 / 2.7255)**4 / h**2 * (1 + NEUTRINO_PER_SPECIES * self.Neff)
+        self.Ode0 = 1 - self.Om0 - self.Or0 if Ode0 is None else float(Ode0)
+        self.Ok0 = 1 - self.Om0 - self.Or0 - self.Ode0
+        self.name = name
+
+    def _key(self):
+        return (self.H0, self.Om0, self.Or0, self.Ode0)
+
+    def efunc(self, z):
+        """H(z) / H0."""
+        zp1 = 1 + np.asarray(z, dtype=float)
+        return np.sqrt(self.Or0 * zp1**4 + self.Om0 * zp1**3 + self.Ok0 * zp1**2 + self.Ode0)
+
+    def hubble(self, z):
+        """H(z) in km/s/Mpc."""
+        return self.H0 * self.efunc(z)
+
+    def hubble_time(self):
+        """1/H0 in Gyr."""
+        return KM_PER_MPC / self.H0 / SECONDS_PER_GYR
+
+    def dt_dz(self, z):
+        """|dt/dz| in years, straight from H(z) with no table."""
+        zp1 = 1 + np.asarray(z, dtype=float)
+        return KM_PER_MPC / (zp1 * self.hubble(z)) / SECONDS_PER_YEAR
+
+    def age_table(self):
+        """(ln a, ln t[Gyr]) on the table grid; computed once per parameter set."""
+        return _age_table(*self._key())
+
+    def age(self, z):
+        """Age of the universe at redshift z, in Gyr."""
+        ln_a, ln_t = self.age_table()
+        return np.exp(_interp(-np.log1p(np.asarray(z, dtype=float)), ln_a, ln_t))
+
+    def age_at_scale_factor(self, a):
+        ln_a, ln_t = self.age_table()
+        return np.exp(_interp(np.log(np.asarray(a, dtype=float)), ln_a, ln_t))
+
+    def scale_factor(self, t):
+        """a at age t (Gyr); 0 at t = 0."""
+        ln_a, ln_t = self.age_table()
+        t = np.asarray(t, dtype=float)
+        with np.errstate(divide='ignore'):
+            a = np.exp(_interp(np.log(t), ln_t, ln_a))
+        return np.where(t == 0, 0.0, a)
+
+    def redshift(self, t):
+        """z at age t (Gyr); inf at t = 0."""
+        with np.errstate(divide='ignore'):
+            return 1 / self.scale_factor(t) - 1
+
+    def lookback_time(self, z):
+        """Gyr between redshift z and today."""
+        return self.age(0) - self.age(z)
+
+    def cmb_temperature(self, z):
+        """T_CMB in K at redshift z."""
+        return self.Tcmb0 * (1 + np.asarray(z, dtype=float))
+
+    def cmb_temperature_at_age(self, t):
+        """T_CMB in K at age t (Gyr)."""
+        with np.errstate(divide='ignore'):
+            return self.Tcmb0 / self.scale_factor(t)
+
+    def __repr__(self):
+        label = f"{self.name!r}, " if self.name else ''
+        return f"Cosmology({label}H0={self.H0}, Om0={self.Om0}, Ode0={self.Ode0:.5f}, Tcmb0={self.Tcmb0})"
+
+
+def _interp(x, xp, fp):
+    # Outside the table is outside what was integrated
+    return np.interp(x, xp, fp, left=np.nan, right=np.nan)
+
+
+@lru_cache(maxsize=16)
+def _age_table(H0, Om0, Or0, Ode0):
+    hubble_time = KM_PER_MPC / H0 / SECONDS_PER_GYR
+    ln_a = np.linspace(LN_A_MIN, LN_A_MAX, TABLE_POINTS)
+    a = np.exp(ln_a)
+    efunc = np.sqrt(Or0 / a**4 + Om0 / a**3 + (1 - Om0 - Or0 - Ode0) / a**2 + Ode0)
+    # dt = d ln a / H(a); before the first grid point radiation (or matter) dominates
+    dt_dln_a = hubble_time / efunc
+    if Or0 > 0:
+        t_start = a[0]**2 / (2 * np.sqrt(Or0)) * hubble_time
+    else:
+        t_start = 2 / 3 * a[0]**1.5 / np.sqrt(Om0) * hubble_time
+    t = np.empty_like(ln_a)
+    t[0] = t_start
+    t[1:] = t_start + np.cumsum(0.5 * (dt_dln_a[1:] + dt_dln_a[:-1]) * np.diff(ln_a))
+    ln_t = np.log(t)
+    ln_a.setflags(write=False)
+    ln_t.setflags(write=False)
+    return ln_a, ln_t
+
+
+# Planck 2015 (TT,TE,EE+lowP+lensing+ext), the parameters of astropy's Planck15
+PLANCK15 = Cosmology(67.74, 0.3075, Tcmb0=2.7255, Neff=3.046, name='Planck15')
@@ -0,0 +1,155 @@
+import os
+import threading
+from collections import OrderedDict
+
+from cosmic_history.lazy import lazy_import
+from cosmic_history.pbdb import DATA_DIR, PBDB_FILE
+from cosmic_history.telemetry import TELEMETRY
+
+pd = lazy_import('pandas')
+
+
+def _csv(fname):
+    def load(data_dir):
+        return pd.read_csv(os.path.join(data_dir, fname))
+    load.source = fname
+    return load
+
+
+def _excel(fname):
+    def load(data_dir):
+        return pd.read_excel(os.path.join(data_dir, fname))
+    load.source = fname
+    return load
+
+
+def _pbdb(columns):
+    def load(data_dir):
+        from cosmic_history.pbdb_cache import OccurrenceCache
+        cache = OccurrenceCache(os.path.join(data_dir, PBDB_FILE))
+        df = cache.load(columns)
+        # The CSV on a build, only the column files once the cache is warm
+        load.bytes_read = cache.bytes_read
+        return df
+    load.source = PBDB_FILE
+    return load
+
+
+# Every file a section reads, by the name sections ask for
+DATASETS = {
+    'universe_expansion': _csv('universe_expansion.csv'),
+    'cmb_temperature': _csv('cmb_temperature_data.csv'),
+    'element_abundance': _excel('Book1.xls'),
+    'geocarb': _excel('GEOCARB_input_arrays_renamed.xlsx'),
+    'geocarb_raw': _excel('GEOCARB_input_arrays.xls'),
+    'pbdb_intervals': _pbdb(['early_interval']),
+    'pbdb_ages': _pbdb(['min_ma', 'max_ma']),
+}
+
+
+def _require_copy_on_write():
+    # The default from pandas 3; pandas 2 has it as an opt-in mode
+    if int(pd.__version__.split('.')[0]) < 3 and not pd.get_option('mode.copy_on_write'):
+        pd.set_option('mode.copy_on_write', True)
+
+
+class DatasetRegistry:
+    """Loads each named dataset at most once and hands out views of it.
+
+    get() returns a shallow copy, so sections can rename, reindex or add
+    columns without affecting each other. Writing into a view (df.loc[...] =,
+    fillna(inplace=True)) copies instead of touching the shared data because
+    of pandas copy-on-write, which the first load switches on under pandas 2
+    for the whole process. Datasets stay loaded until release() is called or, when
+    memory_budget (bytes) is set, until least-recently-used ones have to make
+    room for a new load.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, loaders=None, memory_budget=None):
+        self.data_dir = data_dir
+        self.loaders = dict(DATASETS if loaders is None else loaders)
+        self.memory_budget = memory_budget
+        self.loads = {}
+        self._cache = OrderedDict()
+        self._sizes = {}
+        # (the running section's telemetry stages, tables whose rows it has counted)
+        self._counted = (None, set())
+        self._lock = threading.RLock()
+
+    def register(self, name, loader):
+        """Add or replace a dataset; `loader(data_dir)` returns a DataFrame."""
+        with self._lock:
+            self.loaders[name] = loader
+            self.release(name)
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._cache:
+                _require_copy_on_write()
+                with TELEMETRY.stage('load') as measures:
+                    loader = self.loaders[name]
+                    df = loader(self.data_dir)
+                    source = self.source_path(name)
+                    # Loaders that know what they read say so; otherwise it is the file behind the dataset
+                    measures['bytes_read'] = getattr(loader, 'bytes_read', None)
+                    if measures['bytes_read'] is None:
+                        measures['bytes_read'] = os.path.getsize(source) if source and os.path.exists(source) else 0
+                self.loads[name] = self.loads.get(name, 0) + 1
+                self._cache[name] = df
+                self._sizes[name] = int(df.memory_usage(deep=True).sum())
+                self._enforce_budget(keep=name)
+            self._cache.move_to_end(name)
+            df = self._cache[name]
+            # Rows count for every section handed the data, loaded or shared, but
+            # once per table: pbdb_intervals and pbdb_ages are the same rows
+            stages = TELEMETRY.current()
+            if self._counted[0] is not stages:
+                self._counted = (stages, set())
+            table = self.source_path(name) or name
+            if table not in self._counted[1]:
+                self._counted[1].add(table)
+                TELEMETRY.record('load', rows=len(df), calls=0)
+            return df.copy(deep=False)
+
+    def source_path(self, name):
+        """The file a dataset is read from, or None when its loader does not say."""
+        source = getattr(self.loaders[name], 'source', None)
+        return os.path.join(self.data_dir, source) if source else None
+
+    def release(self, name):
+        """Drop a dataset once no remaining section needs it."""
+        with self._lock:
+            self._cache.pop(name, None)
+            self._sizes.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._sizes.clear()
+
+    @property
+    def nbytes(self):
+        return sum(self._sizes.values())
+
+    def _enforce_budget(self, keep):
+        if self.memory_budget is None:
+            return
+        for name in list(self._cache):
+            if self.nbytes <= self.memory_budget:
+                break
+            if name != keep:
+                self.release(name)
+
+    def __contains__(self, name):
+        return name in self._cache
+
+
+_registry = None
+
+
+def get_registry(data_dir=DATA_DIR):
+    """The process-wide registry shared by all sections."""
+    global _registry
+    if _registry is None or _registry.data_dir != data_dir:
+        _registry = DatasetRegistry(data_dir)
+    return _registry
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+from cosmic_history.pbdb import CHUNK_ROWS, iter_occurrence_chunks
+from cosmic_history.sketch import DEFAULT_PRECISION, GroupedSketches, hash_values
+
+# (run, bin) pairs expanded at once when feeding taxon runs to per-bin sketches
+SKETCH_BATCH = 1 << 22
+
+
+def bin_edges(width, max_age, min_age=0.0):
+    """Fixed-width bin edges in Ma, from min_age to just past max_age."""
+    n = int(np.floor((max_age - min_age) / width)) + 1
+    return min_age + width * np.arange(n + 1)
+
+
+def _bin_span(lo, hi, edges):
+    """First and last bin each [lo, hi] range touches (-1 / n_bins when outside)."""
+    first = np.searchsorted(edges, lo, side='right') - 1
+    last = np.maximum(first, np.searchsorted(edges, hi, side='left') - 1)
+    return first, last
+
+
+def _range_counts(first, last, n_bins):
+    # Difference array: +1 where a range starts, -1 just after it ends
+    first = np.clip(first, 0, n_bins)
+    last = np.clip(last, -1, n_bins - 1)
+    keep = first <= last
+    delta = np.bincount(first[keep], minlength=n_bins + 1)
+    delta -= np.bincount(last[keep] + 1, minlength=n_bins + 1)
+    return np.cumsum(delta[:n_bins])
+
+
+class DiversityCurve:
+    """Range-through occurrence and distinct-taxon counts per time bin.
+
+    Every occurrence is counted in each bin its [min_ma, max_ma] range
+    touches. For distinct taxa the ranges of one taxon are merged into
+    disjoint bin runs first, so a taxon counts once per bin however many
+    of its occurrences fall there. Rows are sorted by (taxon, min_ma) once
+    in the constructor; that order stays valid for any set of bin edges, so
+    sweeping bin widths only repeats the O(rows) searchsorted/bincount work.
+    """
+
+    def __init__(self, min_ma, max_ma, taxa=None):
+        lo = np.asarray(min_ma, dtype=np.float64)
+        hi = np.asarray(max_ma, dtype=np.float64)
+        if taxa is None:
+            codes = np.full(len(lo), -1, dtype=np.int64)
+            self.taxa = pd.Index([], dtype=object)
+        elif isinstance(getattr(taxa, 'dtype', None), pd.CategoricalDtype):
+            codes = np.asarray(taxa.cat.codes, dtype=np.int64)
+            self.taxa = taxa.cat.categories
+        else:
+            codes, self.taxa = pd.factorize(np.asarray(taxa))
+            codes = codes.astype(np.int64)
+        valid = ~(np.isnan(lo) | np.isnan(hi))
+        lo, hi, codes = np.minimum(lo, hi)[valid], np.maximum(lo, hi)[valid], codes[valid]
+
+        order = np.lexsort((lo, codes))
+        self.min_ma = lo[order]
+        self.max_ma = hi[order]
+        self.taxon_codes = codes[order]
+        self.oldest = float(self.max_ma.max()) if len(self.max_ma) else 0.0
+
+    def _taxon_counts(self, first, last, n_bins):
+        _, seg_first, seg_last = self._taxon_runs(first, last, n_bins)
+        return _range_counts(seg_first, seg_last, n_bins)
+
+    def _taxon_runs(self, first, last, n_bins):
+        """(taxon code, first bin, last bin) of each disjoint run of bins a taxon's ranges cover."""
+        named = self.taxon_codes >= 0
+        codes, first, last = self.taxon_codes[named], first[named], last[named]
+        if not len(codes):
+            return codes, codes, codes
+        # Offset each taxon into its own stretch of bin numbers so one running
+        # maximum over the whole array never merges ranges of different taxa
+        stride = n_bins + 3
+        key_lo = codes * stride + np.clip(first, -1, n_bins) + 1
+        key_hi = codes * stride + np.clip(last, -1, n_bins) + 1
+        running = np.maximum.accumulate(key_hi)
+        starts = np.ones(len(key_lo), dtype=bool)
+        starts[1:] = key_lo[1:] > running[:-1] + 1
+        start_idx = np.flatnonzero(starts)
+        end_idx = np.append(start_idx[1:] - 1, len(key_lo) - 1)
+        seg_first = key_lo[start_idx] - codes[start_idx] * stride - 1
+        seg_last = running[end_idx] - codes[start_idx] * stride - 1
+        return codes[start_idx], seg_first, seg_last
+
+    def curve(self, bins=10.0):
+        """Tidy per-bin counts; `bins` is a width in Myr or an array of edges in Ma."""
+        if np.ndim(bins) == 0:
+            edges = bin_edges(float(bins), self.oldest)
+        else:
+            edges = np.sort(np.asarray(bins, dtype=np.float64))
+        n_bins = len(edges) - 1
+        first, last = _bin_span(self.min_ma, self.max_ma, edges)
+        return pd.DataFrame({
+            'bin_min_ma': edges[:-1],
+            'bin_max_ma': edges[1:],
+            'bin_mid_ma': (edges[:-1] + edges[1:]) / 2,
+            'occurrences': _range_counts(first, last, n_bins),
+            'taxa': self._taxon_counts(first, last, n_bins),
+        })
+
+    def sweep(self, widths):
+        """curve() for each bin width, stacked with a bin_width column."""
+        frames = [self.curve(w).assign(bin_width=float(w)) for w in widths]
+        return pd.concat(frames, ignore_index=True)
+
+
+def diversity_curve(min_ma, max_ma, taxa=None, bins=10.0, approximate=False, precision=DEFAULT_PRECISION,
+                    chunksize=CHUNK_ROWS):
+    """Per-bin counts; approximate=True counts taxa with per-bin sketches, `chunksize` rows at a time."""
+    if not approximate:
+        return DiversityCurve(min_ma, max_ma, taxa).curve(bins)
+    curve = SketchedDiversity(bins, precision)
+    for start in range(0, len(min_ma), chunksize):
+        rows = slice(start, start + chunksize)
+        curve.add(min_ma[rows], max_ma[rows], None if taxa is None else taxa[rows])
+    return curve.curve()
+
+
+class SketchedDiversity:
+    """diversity_curve() accumulated chunk by chunk, with taxa counted by HyperLogLog.
+
+    Occurrence counts are exact. For taxa each chunk merges every taxon's
+    ranges into disjoint bin runs (as DiversityCurve does) and adds the
+    taxon's hash to the sketch of every bin a run covers; a taxon seen in
+    several chunks lands in the same registers, so the merged sketches
+    count it once. Memory is one 2**precision-byte sketch per bin plus one
+    chunk, so whole PBDB exports fit however many rows or taxa they have.
+    Each bin's taxon count carries the sketch error (about
+    1.04 / sqrt(2**precision), see sketch.HyperLogLog). `bins` is a width in
+    Myr (bins start at 0 Ma and grow with the oldest age seen) or fixed edges.
+    """
+
+    def __init__(self, bins=10.0, precision=DEFAULT_PRECISION):
+        self.width = float(bins) if np.ndim(bins) == 0 else None
+        self.edges = None if self.width else np.sort(np.asarray(bins, dtype=np.float64))
+        self.oldest = 0.0
+        self.occurrences = np.zeros(0, dtype=np.int64)
+        self.sketches = GroupedSketches(precision)
+
+    def _edges(self):
+        return bin_edges(self.width, self.oldest) if self.width else self.edges
+
+    def add(self, min_ma, max_ma, taxa=None):
+        chunk = DiversityCurve(min_ma, max_ma, taxa)
+        self.oldest = max(self.oldest, chunk.oldest)
+        edges = self._edges()
+        n_bins = len(edges) - 1
+        first, last = _bin_span(chunk.min_ma, chunk.max_ma, edges)
+        counts = _range_counts(first, last, n_bins)
+        self.occurrences = np.pad(self.occurrences, (0, n_bins - len(self.occurrences)))
+        self.occurrences[:n_bins] += counts
+
+        codes, seg_first, seg_last = chunk._taxon_runs(first, last, n_bins)
+        seg_first, seg_last = np.clip(seg_first, 0, None), np.clip(seg_last, None, n_bins - 1)
+        keep = seg_first <= seg_last
+        if not keep.any():
+            return self
+        taxon_hashes, _ = hash_values(pd.Series(np.asarray(chunk.taxa, dtype=object)))
+        hashes, seg_first, lengths = taxon_hashes[codes[keep]], seg_first[keep], (seg_last - seg_first + 1)[keep]
+        # Expand runs to (bin, hash) pairs in batches of about SKETCH_BATCH pairs
+        ends = np.cumsum(lengths)
+        start = 0
+        while start < len(lengths):
+            stop = max(start + 1, int(np.searchsorted(ends, ends[start] - lengths[start] + SKETCH_BATCH, 'right')))
+            n = lengths[start:stop]
+            offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+            self.sketches.add_hashes(np.repeat(seg_first[start:stop], n) + offsets, np.repeat(hashes[start:stop], n))
+            start = stop
+        return self
+
+    def merge(self, other):
+        """Fold in a SketchedDiversity built elsewhere (another chunk range or process)."""
+        self.oldest = max(self.oldest, other.oldest)
+        n = max(len(self.occurrences), len(other.occurrences))
+        self.occurrences = np.pad(self.occurrences, (0, n - len(self.occurrences)))
+        self.occurrences[:len(other.occurrences)] += other.occurrences
+        self.sketches.merge(other.sketches)
+        return self
+
+    def curve(self):
+        """Same columns as DiversityCurve.curve(); taxa are rounded estimates."""
+        edges = self._edges()
+        n_bins = len(edges) - 1
+        occurrences = np.pad(self.occurrences, (0, max(0, n_bins - len(self.occurrences))))[:n_bins]
+        taxa = self.sketches.counts().reindex(range(n_bins), fill_value=0.0)
+        return pd.DataFrame({
+            'bin_min_ma': edges[:-1],
+            'bin_max_ma': edges[1:],
+            'bin_mid_ma': (edges[:-1] + edges[1:]) / 2,
+            'occurrences': occurrences,
+            'taxa': np.rint(taxa.to_numpy()).astype(np.int64),
+        })
+
+
+def streamed_diversity_curve(path=None, bins=10.0, taxon='accepted_name', precision=DEFAULT_PRECISION,
+                             chunksize=CHUNK_ROWS):
+    """diversity_curve(approximate=True) over pbdb_occurrences.csv, streamed so memory stays bounded."""
+    curve = SketchedDiversity(bins, precision)
+    for chunk in iter_occurrence_chunks(path, ['min_ma', 'max_ma', taxon], chunksize):
+        curve.add(chunk['min_ma'].to_numpy(), chunk['max_ma'].to_numpy(), chunk[taxon])
+    return curve.curve()
@@ -0,0 +1,71 @@
+"""Import-time budget for cosmic_history_analysis.
+
+    python -m cosmic_history.importtime [--budget-ms 150] [--top 10]
+
+Imports the script in a fresh interpreter under ``python -X importtime`` and
+fails when the total exceeds the budget or when a heavy library (numpy,
+pandas, matplotlib, the Excel engines) was loaded just by importing it.
+Those should only load inside the sections that use them.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of `import cosmic_history_analysis`, stdlib included
+IMPORT_BUDGET_MS = 150
+
+HEAVY = ('numpy', 'pandas', 'matplotlib', 'xlrd', 'openpyxl', 'scipy')
+
+
+def measure(statement='import cosmic_history_analysis', cwd=REPO_DIR):
+    """Run `statement` under -X importtime; returns {module: cumulative microseconds}.
+
+    Only top-level imports are summed for the total, so nested imports are
+    not counted twice.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                          cwd=cwd, capture_output=True, text=True, check=True)
+    times, top_level = {}, 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        cumulative = int(cumulative)
+        times[name.strip()] = cumulative
+        # Nested imports are indented two spaces per level under their parent
+        if not name[1:].startswith(' '):
+            top_level += cumulative
+    return times, top_level
+
+
+def heavy_modules(times):
+    return sorted(m for m in times if m in HEAVY)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10, help='slowest modules to list')
+    parser.add_argument('--statement', default='import cosmic_history_analysis')
+    args = parser.parse_args(argv)
+
+    times, total = measure(args.statement)
+    print(f"{args.statement}: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for module, us in sorted(times.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+    heavy = heavy_modules(times)
+    failed = False
+    if heavy:
+        print(f"heavy modules imported eagerly: {', '.join(heavy)}")
+        failed = True
+    if total > args.budget_ms * 1000:
+        print("import-time budget exceeded")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+
+from cosmic_history.pbdb_cache import file_fingerprint
+from cosmic_history.render import export_paths, export_settings
+
+MANIFEST = '.figure_cache.json'
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def library_version():
+    """Hash of the cosmic_history sources, so helper changes invalidate every section."""
+    h = hashlib.sha256()
+    for fname in sorted(glob.glob(os.path.join(LIB_DIR, '*.py'))):
+        with open(fname, 'rb') as f:
+            h.update(os.path.basename(fname).encode() + b'\0' + f.read())
+    return h.hexdigest()
+
+
+def code_version(func):
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = repr(func.__code__.co_code) + repr(func.__code__.co_consts)
+    return _sha256(source.encode())
+
+
+class OutputCache:
+    """Content-addressed record of which section outputs are up to date.
+
+    A section's key hashes its code, its declared params, the content of every
+    input file and the cosmic_history sources. After a run, the key is stored
+    with the hash of each file the section wrote; a later run skips the
+    section only if the key is unchanged and every recorded file is still on
+    disk with the same content. File hashes are memoised by size and mtime,
+    so an unchanged 200 MB CSV is not re-read.
+    """
+
+    def __init__(self, datasets, path=MANIFEST):
+        self.datasets = datasets
+        self.path = path
+        self.hits = []
+        self.misses = []
+        self._lib = library_version()
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        self.sections = manifest.get('sections', {})
+        self.files = manifest.get('files', {})
+
+    def file_hash(self, path):
+        quick = file_fingerprint(path, with_hash=False)
+        known = self.files.get(os.path.abspath(path))
+        if known and known['size'] == quick['size'] and known['mtime_ns'] == quick['mtime_ns']:
+            return known['sha256']
+        fp = file_fingerprint(path)
+        self.files[os.path.abspath(path)] = fp
+        return fp['sha256']
+
+    def key(self, section):
+        inputs = {}
+        for name in section.inputs:
+            source = self.datasets.source_path(name)
+            inputs[name] = self.file_hash(source) if source and os.path.exists(source) else None
+        blob = json.dumps({
+            'section': section.name,
+            'code': code_version(section.func),
+            'params': section.params,
+            'inputs': inputs,
+            'lib': self._lib,
+            'export': export_settings(),
+        }, sort_keys=True, default=repr)
+        return _sha256(blob.encode())
+
+    def _written(self, section):
+        files = []
+        for pattern in section.outputs:
+            files.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+        # Charts also leave their extra export formats and thumbnails
+        files = [p for f in files for p in (export_paths(f) if f.endswith('.png') else [f])]
+        return [f for f in files if os.path.exists(f)]
+
+    def is_fresh(self, section, key):
+        entry = self.sections.get(section.name)
+        if not entry or entry['key'] != key or not entry['files']:
+            return False
+        return all(os.path.exists(f) and self.file_hash(f) == h for f, h in entry['files'].items())
+
+    def partition(self, sections):
+        """Split into (sections to run, {name: key}) and note hits/misses."""
+        stale, keys = [], {}
+        for s in sections:
+            keys[s.name] = key = self.key(s)
+            if self.is_fresh(s, key):
+                self.hits.append(s.name)
+            else:
+                self.misses.append(s.name)
+                stale.append(s)
+        return stale, keys
+
+    def record(self, section, key):
+        self.sections[section.name] = {
+            'key': key,
+            'files': {f: self.file_hash(f) for f in self._written(section)},
+        }
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'sections': self.sections, 'files': self.files}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def report(self):
+        return (f"output cache: {len(self.hits)} up to date, {len(self.misses)} rendered"
+                + (f" ({', '.join(self.misses)})" if self.misses else ''))
@@ -0,0 +1,67 @@
+import os
+
+from cosmic_history.lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+DATA_DIR = "data"
+PBDB_FILE = 'pbdb_occurrences.csv'
+
+# ~1.66M rows / 205 MB on disk; 250k rows keeps each parsed chunk small
+CHUNK_ROWS = 250_000
+
+# Compact dtypes for the PBDB columns the sections actually read
+PBDB_DTYPES = {
+    'occurrence_no': 'int64',
+    'collection_no': 'int64',
+    'identified_name': 'category',
+    'identified_rank': 'category',
+    'accepted_name': 'category',
+    'accepted_rank': 'category',
+    'accepted_no': 'float64',
+    'early_interval': 'category',
+    'late_interval': 'category',
+    'max_ma': 'float32',
+    'min_ma': 'float32',
+    'reference_no': 'int64',
+}
+
+
+def pbdb_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, PBDB_FILE)
+
+
+def iter_occurrence_chunks(path=None, columns=('early_interval',), chunksize=CHUNK_ROWS):
+    """Yield the occurrences in chunks, parsing only `columns` with compact dtypes."""
+    path = path or pbdb_path()
+    columns = list(columns)
+    dtypes = {c: PBDB_DTYPES.get(c, 'category') for c in columns}
+    reader = pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield chunk[columns]
+
+
+def _concat_chunks(chunks, columns):
+    if not chunks:
+        return pd.DataFrame({c: pd.Series(dtype=PBDB_DTYPES.get(c, 'category')) for c in columns})
+    out = {}
+    for c in columns:
+        parts = [chunk[c] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            # Each chunk infers its own categories; merge them into one sorted set
+            out[c] = pd.Series(pd.api.types.union_categoricals(parts, sort_categories=True), name=c)
+        else:
+            out[c] = pd.Series(pd.concat(parts, ignore_index=True).to_numpy(), name=c)
+    return pd.DataFrame(out)
+
+
+def read_occurrences(path=None, columns=('early_interval',), chunksize=CHUNK_ROWS):
+    """Load only `columns` of pbdb_occurrences.csv, streaming it chunk by chunk.
+
+    Interval and taxon names come back as categoricals and ages as float32, so
+    peak memory is roughly one raw chunk plus the compact result.
+    """
+    columns = list(columns)
+    chunks = list(iter_occurrence_chunks(path, columns, chunksize))
+    return _concat_chunks(chunks, columns)
@@ -0,0 +1,208 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+
+from cosmic_history.lazy import lazy_import
+from cosmic_history.pbdb import pbdb_path, read_occurrences
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+CACHE_DIRNAME = '.pbdb_cache'
+MANIFEST = 'manifest.json'
+CACHE_VERSION = 1
+
+
+def file_fingerprint(path, with_hash=True):
+    """Size, mtime and (optionally) SHA-256 of the source CSV."""
+    st = os.stat(path)
+    fp = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    if with_hash:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        fp['sha256'] = h.hexdigest()
+    return fp
+
+
+def default_cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+
+
+def _write_json(path, obj):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def _save_npy(path, arr):
+    # np.save appends .npy itself, so write to a .tmp.npy name and rename
+    tmp = path[:-len('.npy')] + '.tmp.npy'
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+class OccurrenceCache:
+    """Memory-mapped NumPy column files for pbdb_occurrences.csv.
+
+    Each column is converted the first time a section asks for it. The cache
+    is keyed by the CSV's size, mtime and SHA-256: a matching size/mtime is
+    trusted as-is, a changed mtime triggers a re-hash, and a changed hash
+    drops every column so it is rebuilt from the new file, unless
+    apply_sync() has already patched the columns for an incremental sync.
+    bytes_read adds up what this instance read: the CSV when it hashes or
+    converts it, the column files when it serves them.
+    """
+
+    def __init__(self, path=None, cache_dir=None):
+        self.path = path or pbdb_path()
+        self.cache_dir = cache_dir or default_cache_dir(self.path)
+        self._manifest = None
+        self.bytes_read = 0
+
+    def _fingerprint(self):
+        fp = file_fingerprint(self.path)
+        self.bytes_read += fp['size']
+        return fp
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.cache_dir, MANIFEST)
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != CACHE_VERSION:
+            return None
+        return manifest
+
+    def _fresh_manifest(self, fingerprint):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = {'version': CACHE_VERSION, 'source': fingerprint, 'rows': None, 'columns': {}}
+        _write_json(self.manifest_path, manifest)
+        return manifest
+
+    def validate(self):
+        """Return the manifest for the current CSV, resetting it if the CSV changed."""
+        manifest = self._read_manifest()
+        quick = file_fingerprint(self.path, with_hash=False)
+        full = None
+        if manifest is not None:
+            source = manifest['source']
+            if source['size'] == quick['size'] and source['mtime_ns'] == quick['mtime_ns']:
+                self._manifest = manifest
+                return manifest
+            if source['size'] == quick['size']:
+                # Touched but possibly unchanged: only the hash can tell
+                full = self._fingerprint()
+                if full['sha256'] == source.get('sha256'):
+                    manifest['source'] = full
+                    _write_json(self.manifest_path, manifest)
+                    self._manifest = manifest
+                    return manifest
+        # A same-size file was hashed above; a rebuild needs that hash, not another pass
+        self._manifest = self._fresh_manifest(full or self._fingerprint())
+        return self._manifest
+
+    def _column_files(self, name):
+        safe = hashlib.md5(name.encode()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f'{safe}.npy'), os.path.join(self.cache_dir, f'{safe}.categories.json')
+
+    def _build(self, columns):
+        manifest = self._manifest
+        df = read_occurrences(self.path, columns=columns)
+        self.bytes_read += os.path.getsize(self.path)
+        for name in columns:
+            self._save_column(name, df[name])
+        manifest['rows'] = len(df)
+        _write_json(self.manifest_path, manifest)
+
+    def _save_column(self, name, col):
+        values, cats_file = self._column_files(name)
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            _save_npy(values, np.asarray(col.cat.codes))
+            _write_json(cats_file, col.cat.categories.tolist())
+            entry = {'kind': 'category', 'dtype': str(col.cat.codes.dtype)}
+        else:
+            _save_npy(values, col.to_numpy())
+            entry = {'kind': 'array', 'dtype': str(col.dtype)}
+        self._manifest['columns'][name] = entry
+
+    def _load_column(self, name):
+        entry = self._manifest['columns'][name]
+        values, cats_file = self._column_files(name)
+        arr = np.load(values, mmap_mode='r')
+        self.bytes_read += os.path.getsize(values)
+        if entry['kind'] == 'category':
+            self.bytes_read += os.path.getsize(cats_file)
+            with open(cats_file) as f:
+                categories = json.load(f)
+            return pd.Series(pd.Categorical.from_codes(arr, categories), name=name)
+        return pd.Series(arr, name=name, copy=False)
+
+    def load(self, columns=('early_interval',)):
+        columns = list(columns)
+        manifest = self.validate()
+        missing = [c for c in columns if c not in manifest['columns']]
+        if missing:
+            self._build(missing)
+        return pd.DataFrame({c: self._load_column(c) for c in columns})
+
+    def apply_sync(self, result):
+        """Patch the cached columns with an incremental sync's rows instead of rebuilding them.
+
+        The merge keeps the surviving rows in order and appends the incoming
+        ones, so each column is its kept values followed by the parsed delta.
+        Only done while the cache still describes the store as it was before
+        the merge (result.previous); returns whether the cache was patched.
+        Files derived from the old rows are removed, to be rebuilt on demand.
+        """
+        manifest = self._read_manifest()
+        if manifest is None or result.kept is None or not manifest['columns']:
+            return False
+        source, previous = manifest['source'], result.previous
+        if ((source['size'], source['mtime_ns']) != (previous['size'], previous['mtime_ns'])
+                or manifest['rows'] != len(result.kept)):
+            return False
+        self._manifest = manifest
+        columns = list(manifest['columns'])
+        # The same parser a rebuild would use, run over the delta's text
+        text = io.StringIO(result.added.reindex(columns=columns, fill_value='').to_csv(index=False))
+        added = read_occurrences(text, columns=columns)
+        for name in columns:
+            old = self._load_column(name)[result.kept].reset_index(drop=True)
+            if isinstance(old.dtype, pd.CategoricalDtype):
+                col = pd.api.types.union_categoricals([old, added[name]], sort_categories=True)
+                col = col.remove_unused_categories()
+            else:
+                col = pd.Series(np.concatenate([old.to_numpy(), added[name].to_numpy()]).astype(old.dtype))
+            self._save_column(name, pd.Series(col, name=name))
+        manifest['rows'] = int(result.kept.sum()) + len(added)
+        self._drop_derived()
+        manifest['source'] = file_fingerprint(self.path)
+        _write_json(self.manifest_path, manifest)
+        return True
+
+    def _drop_derived(self):
+        # Anything else kept next to the columns (such as sketch.load_stage_sketches'
+        # .npz files) was computed from the old rows and is only checked against
+        # the fingerprint, which apply_sync re-stamps
+        keep = {MANIFEST}
+        for name in self._manifest['columns']:
+            keep.update(os.path.basename(f) for f in self._column_files(name))
+        for fname in os.listdir(self.cache_dir):
+            if fname not in keep:
+                os.remove(os.path.join(self.cache_dir, fname))
+
+
+def load_occurrences(path=None, columns=('early_interval',), cache_dir=None):
+    """Like read_occurrences(), but served from the columnar cache after the first run."""
+    return OccurrenceCache(path, cache_dir).load(columns)
@@ -0,0 +1,207 @@
+import io
+import json
+import os
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+
+from cosmic_history.pbdb import pbdb_path
+from cosmic_history.pbdb_cache import OccurrenceCache, file_fingerprint
+
+PBDB_URL = "https://paleobiodb.org/data1.2/occs/list.csv"
+# Same selection as the notebook's export, plus created/modified timestamps
+PBDB_PARAMS = {'max_ma': 10000, 'show': 'crmod'}
+PAGE_ROWS = 100_000
+KEY = 'occurrence_no'
+
+
+def fetch_pages(params, base_url=PBDB_URL, page_rows=PAGE_ROWS, timeout=300):
+    """Yield the records matching `params` one limit/offset page at a time, as text columns."""
+    offset = 0
+    while True:
+        query = urlencode(dict(params, limit=page_rows, offset=offset))
+        with urlopen(f"{base_url}?{query}", timeout=timeout) as resp:
+            body = resp.read()
+        if not body.strip():
+            return
+        page = pd.read_csv(io.BytesIO(body), dtype=str, keep_default_na=False)
+        yield page
+        if len(page) < page_rows:
+            return
+        offset += page_rows
+
+
+def _interval_counts(intervals):
+    # Rows are kept as text, so a missing interval is '' rather than NaN
+    return intervals[intervals != ''].value_counts()
+
+
+class SyncResult:
+    """What a sync changed.
+
+    added_counts holds the early_interval counts of every incoming row and
+    removed_intervals the early_interval of every row replaced. An
+    incremental sync also keeps the incoming rows themselves (`added`), which
+    rows of the old store survived (`kept`, a boolean mask in file order)
+    and the old store's fingerprint (`previous`), so OccurrenceCache can
+    patch its column files instead of re-reading the whole CSV. A full sync
+    streams straight to disk and keeps none of the rows.
+    """
+
+    def __init__(self, added_counts, removed_intervals, full, rows, added=None, kept=None, previous=None):
+        self.added_counts = added_counts
+        self.removed_intervals = removed_intervals
+        self.full = full
+        self.rows = rows
+        self.added = added
+        self.kept = kept
+        self.previous = previous
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def affected_intervals(self):
+        """Stages whose occurrence counts may have changed."""
+        return set(self.added_counts.index) | set(self.removed_intervals)
+
+    def apply_to_stage_counts(self, counts):
+        """Update a per-stage count Series (see aggregate.stage_counts) without re-reading the store."""
+        if self.full:
+            out = self.added_counts
+        else:
+            out = counts.astype('int64').add(self.added_counts, fill_value=0)
+            out = out.sub(_interval_counts(pd.Series(self.removed_intervals, dtype=str)), fill_value=0)
+        out = out[out > 0].astype('int64').sort_index()
+        out.index.name = 'early_interval'
+        return out.rename('count')
+
+
+def _state_path(path):
+    return os.path.splitext(path)[0] + '.sync.json'
+
+
+def _read_state(state_path):
+    try:
+        with open(state_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class _PageStats:
+    """Running max(modified), early_interval counts and row count over the pages seen."""
+
+    def __init__(self):
+        self.last_modified = None
+        self.counts = pd.Series(dtype='int64')
+        self.rows = 0
+
+    def add(self, page):
+        self.rows += len(page)
+        if 'early_interval' in page:
+            self.counts = self.counts.add(_interval_counts(page['early_interval']), fill_value=0).astype('int64')
+        if 'modified' in page and len(page):
+            self.last_modified = max(filter(None, [self.last_modified, page['modified'].max()]))
+
+
+def _download(path, pages):
+    """Stream a full export into the store page by page; returns its _PageStats.
+
+    Only the occurrence_no values seen so far stay in memory (as a sorted
+    int64 array), to drop records that offset paging served twice; the
+    first copy is kept.
+    """
+    stats = _PageStats()
+    seen = np.empty(0, dtype='int64')
+    columns = None
+    tmp = path + '.tmp'
+    with open(tmp, 'w', newline='') as out:
+        for page in pages:
+            page = page.drop_duplicates(KEY, keep='first')
+            keys = page[KEY].astype('int64').to_numpy()
+            fresh = ~np.isin(keys, seen, assume_unique=True)
+            page, seen = page[fresh], np.union1d(seen, keys[fresh])
+            if columns is None:
+                columns = list(page.columns)
+                out.write(','.join(columns) + '\n')
+            page.reindex(columns=columns, fill_value='').to_csv(out, header=False, index=False)
+            stats.add(page)
+        if columns is None:
+            out.write(','.join([KEY, 'early_interval']) + '\n')
+    os.replace(tmp, path)
+    return stats
+
+
+def _merge(path, delta, chunksize=250_000):
+    """Rewrite the store with `delta` replacing rows of the same occurrence_no.
+
+    The store is streamed as text so untouched rows are written back as-is,
+    in their order, followed by the delta. Returns the early_interval values
+    of the rows that were replaced and the mask of old rows kept.
+    """
+    changed = set(delta[KEY])
+    removed = []
+    kept = []
+    tmp = path + '.tmp'
+    columns = None
+    reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize)
+    with reader, open(tmp, 'w', newline='') as out:
+        for chunk in reader:
+            if columns is None:
+                columns = list(chunk.columns)
+                out.write(','.join(columns) + '\n')
+            hit = chunk[KEY].isin(changed)
+            if hit.any():
+                removed.extend(chunk.loc[hit, 'early_interval'])
+            kept.append(~hit.to_numpy())
+            chunk[~hit].to_csv(out, header=False, index=False)
+        delta.reindex(columns=columns, fill_value='').to_csv(out, header=False, index=False)
+    os.replace(tmp, path)
+    return removed, np.concatenate(kept) if kept else np.empty(0, dtype=bool)
+
+
+def sync_occurrences(path=None, base_url=PBDB_URL, state_path=None, page_rows=PAGE_ROWS, full=False,
+                     update_cache=True):
+    """Bring the local pbdb_occurrences.csv up to date with the PBDB API.
+
+    The first run (or full=True) downloads everything, writing each page to
+    disk as it arrives. Later runs ask only for records with
+    occs_modified_after the newest `modified` timestamp seen so far and merge
+    them into the CSV by occurrence_no; with update_cache the columnar cache
+    (pbdb_cache) is then patched with just those rows rather than rebuilt.
+    PBDB does not report deletions, so removed records stay until the next
+    full sync.
+    """
+    path = path or pbdb_path()
+    state_path = state_path or _state_path(path)
+    state = _read_state(state_path)
+    params = dict(PBDB_PARAMS)
+    incremental = not full and bool(state and state.get('last_modified')) and os.path.exists(path)
+    if incremental:
+        params['occs_modified_after'] = state['last_modified']
+
+    pages = fetch_pages(params, base_url, page_rows)
+    if incremental:
+        # Deltas are small, so they are merged from memory
+        pages = list(pages)
+        delta = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=[KEY, 'early_interval'])
+        delta = delta.drop_duplicates(KEY, keep='last')
+        stats = _PageStats()
+        stats.add(delta)
+        previous = file_fingerprint(path, with_hash=False)
+        removed, kept = _merge(path, delta) if len(delta) else ([], None)
+        result = SyncResult(stats.counts, removed, False, stats.rows, delta, kept, previous)
+    else:
+        stats = _download(path, pages)
+        result = SyncResult(stats.counts, [], True, stats.rows)
+
+    last_modified = state['last_modified'] if incremental else None
+    last_modified = max(filter(None, [last_modified, stats.last_modified]), default=None)
+    with open(state_path, 'w') as f:
+        json.dump({'last_modified': last_modified, 'source': base_url}, f)
+    if update_cache and result.kept is not None:
+        OccurrenceCache(path).apply_sync(result)
+    return result
@@ -0,0 +1,330 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cosmic_history.lazy import is_loaded, lazy_import
+from cosmic_history.telemetry import TELEMETRY
+from cosmic_history.writer import WRITER
+
+# pyplot is only imported once a figure is actually drawn
+plt = lazy_import('matplotlib.pyplot')
+np = lazy_import('numpy')
+
+# (file name, seconds spent drawing and writing it) for every figure written by this process
+RENDER_LOG = []
+_batch = False
+
+# Formats written next to each chart's PNG, as (format, dpi) with dpi None
+# for the figure's own; set with configure_export
+EXPORT_FORMATS = []
+# What Figure.savefig writes with the non-interactive backends, without importing matplotlib to ask
+SAVE_FORMATS = frozenset(['eps', 'jpeg', 'jpg', 'pdf', 'pgf', 'png', 'ps', 'raw', 'rgba', 'svg', 'svgz', 'tif',
+                          'tiff', 'webp'])
+THUMBNAIL_WIDTH = None
+# savefig rcParams the one-draw export path reproduces only at these (default) values
+SAVEFIG_DEFAULTS = {'savefig.dpi': 'figure', 'savefig.transparent': False, 'savefig.bbox': None,
+                    'savefig.facecolor': 'auto', 'savefig.edgecolor': 'auto'}
+# zlib level 0-9 for every PNG written; None keeps Pillow's default (6)
+PNG_COMPRESS_LEVEL = None
+
+
+def set_batch_mode(enabled=True):
+    """Headless runs: switch to the Agg backend and close figures instead of showing them."""
+    global _batch
+    if enabled:
+        if is_loaded('matplotlib.pyplot'):
+            plt.switch_backend('Agg')
+        else:
+            os.environ['MPLBACKEND'] = 'Agg'
+    _batch = enabled
+
+
+def parse_formats(value):
+    """'svg,pdf,png@300' -> [('svg', None), ('pdf', None), ('png', 300)] for --export.
+
+    Raises argparse.ArgumentTypeError for a format matplotlib cannot save, a
+    bad dpi, or a plain 'png' (which would overwrite the chart's own PNG).
+    """
+    import argparse
+    formats = []
+    for item in value.split(','):
+        fmt, at, dpi = item.strip().lower().partition('@')
+        if not fmt:
+            continue
+        if fmt not in SAVE_FORMATS:
+            raise argparse.ArgumentTypeError(
+                f"unsupported export format {fmt!r} (choose from {', '.join(sorted(SAVE_FORMATS))})")
+        if at and not (dpi.isdigit() and int(dpi) > 0):
+            raise argparse.ArgumentTypeError(f"bad dpi in {item.strip()!r}: expected format@dpi, e.g. png@300")
+        if fmt == 'png' and not at:
+            raise argparse.ArgumentTypeError("every chart is already written as PNG; use png@DPI for another resolution")
+        if (fmt, int(dpi) if at else None) not in formats:
+            formats.append((fmt, int(dpi) if at else None))
+    return formats
+
+
+def configure_export(formats=None, thumbnail=None, png_compress_level=None):
+    """Set what finish_figure writes besides each chart's PNG.
+
+    formats: extra (format, dpi) pairs, e.g. parse_formats('svg,pdf,png@300');
+    thumbnail: width in pixels of a <name>.thumb.png preview;
+    png_compress_level: 0 (fast, large) to 9 (slow, small).
+    """
+    global EXPORT_FORMATS, THUMBNAIL_WIDTH, PNG_COMPRESS_LEVEL
+    EXPORT_FORMATS = list(formats or [])
+    THUMBNAIL_WIDTH = thumbnail
+    PNG_COMPRESS_LEVEL = png_compress_level
+
+
+def export_settings():
+    """The export configuration, for keying cached outputs."""
+    return {'formats': EXPORT_FORMATS, 'thumbnail': THUMBNAIL_WIDTH, 'png_compress_level': PNG_COMPRESS_LEVEL}
+
+
+def export_paths(fname):
+    """Every file finish_figure writes for a chart saved as `fname`, the chart's own file first."""
+    root, _ = os.path.splitext(fname)
+    paths = [fname]
+    for fmt, dpi in EXPORT_FORMATS:
+        paths.append(f"{root}@{dpi}dpi.{fmt}" if dpi else f"{root}.{fmt}")
+    if THUMBNAIL_WIDTH:
+        paths.append(f"{root}.thumb.png")
+    return paths
+
+
+def _clock():
+    return time.perf_counter(), time.process_time()
+
+
+def _rasterize(fig, dpi=None):
+    """Draw the figure with Agg (at `dpi` if given) and return a copy of its RGBA pixels and the dpi used."""
+    figure_dpi = fig.dpi
+    if dpi:
+        fig.dpi = dpi
+    try:
+        fig.canvas.draw()
+        return np.asarray(fig.canvas.buffer_rgba()).copy(), fig.dpi
+    finally:
+        fig.dpi = figure_dpi
+
+
+def _write_png(path, pixels, dpi):
+    # The same call Agg's print_png makes, so the file matches a plain savefig
+    from matplotlib.image import imsave
+    pil_kwargs = None if PNG_COMPRESS_LEVEL is None else {'compress_level': PNG_COMPRESS_LEVEL}
+    imsave(path, pixels, format='png', origin='upper', dpi=dpi, pil_kwargs=pil_kwargs)
+
+
+def _write_thumbnail(path, pixels, width):
+    from PIL import Image
+    image = Image.fromarray(pixels)
+    image.thumbnail((width, max(1, round(width * image.height / image.width))), Image.LANCZOS)
+    image.save(path, format='png', compress_level=6 if PNG_COMPRESS_LEVEL is None else PNG_COMPRESS_LEVEL)
+
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _timed_write(write, path, *args):
+    start = time.perf_counter()
+    write(path, *args)
+    return time.perf_counter() - start, os.path.getsize(path)
+
+
+class _ChartWrite:
+    """Logs a chart in RENDER_LOG and telemetry once the writer has finished all of its files."""
+
+    def __init__(self, fname, draw_seconds, files, stages):
+        self.fname = fname
+        self.seconds = draw_seconds
+        self.pending = files
+        self.stages = stages
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def done(self, result):
+        seconds, nbytes = result
+        with self._lock:
+            self.seconds += seconds
+            self.written += nbytes
+            self.pending -= 1
+            if self.pending:
+                return
+        RENDER_LOG.append((self.fname, self.seconds))
+        TELEMETRY.record('save', into=self.stages, background_s=self.seconds, bytes_written=self.written, calls=0)
+
+
+def _export(fig, fname):
+    """Draw once, hand every configured output to the figure writer; returns when drawing ended.
+
+    The chart is rasterized once; its pixels are PNG-encoded and thumbnailed
+    on the writer threads. Other DPIs and vector formats need their own
+    draw, which happens here, and only their finished bytes are queued. The
+    files are on disk after WRITER.flush(), not necessarily on return.
+    """
+    start = _clock()
+    paths = export_paths(fname)
+    pixels, dpi = _rasterize(fig)
+    writes = [(_write_png, fname, pixels, dpi)]
+    for (fmt, fmt_dpi), path in zip(EXPORT_FORMATS, paths[1:]):
+        if fmt == 'png':
+            writes.append((_write_png, path, *_rasterize(fig, fmt_dpi)))
+        else:
+            buf = io.BytesIO()
+            fig.savefig(buf, format=fmt, dpi=fmt_dpi or 'figure')
+            writes.append((_write_bytes, path, buf.getvalue()))
+    if THUMBNAIL_WIDTH:
+        writes.append((_write_thumbnail, paths[-1], pixels, THUMBNAIL_WIDTH))
+    drawn = _clock()
+    chart = _ChartWrite(fname, drawn[0] - start[0], len(writes), TELEMETRY.current())
+    for write in writes:
+        WRITER.submit(_timed_write, *write, done=chart.done)
+    return drawn
+
+
+def _fast_path(fig, fname, savefig_kw):
+    """Whether _export writes the same PNG savefig would.
+
+    It copies the canvas' own draw, so it needs a plain Agg canvas (GUI
+    canvases scale fig.dpi on HiDPI screens), a .png name, no savefig
+    options and the savefig rcParams it does not apply at their defaults.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    return (not savefig_kw and type(fig.canvas) is FigureCanvasAgg
+            and isinstance(fname, str) and fname.lower().endswith('.png')
+            and all(plt.rcParams[k] == v for k, v in SAVEFIG_DEFAULTS.items()))
+
+
+def _savefig(fig, fname, savefig_kw):
+    # Plain savefig for other canvases, names, or savefig options; the
+    # draw_event that ends the (last) draw splits drawing from encoding
+    drawn = []
+    cid = fig.canvas.mpl_connect('draw_event', lambda event: drawn.append(_clock()))
+    start = _clock()
+    paths = export_paths(fname)
+    fig.savefig(fname, **savefig_kw)
+    fig.canvas.mpl_disconnect(cid)
+    for (fmt, dpi), path in zip(EXPORT_FORMATS, paths[1:]):
+        fig.savefig(path, **{**savefig_kw, 'format': fmt, 'dpi': dpi or savefig_kw.get('dpi', 'figure')})
+    RENDER_LOG.append((fname, time.perf_counter() - start[0]))
+    return (drawn[0] if drawn else start), paths[:len(EXPORT_FORMATS) + 1]
+
+
+def finish_figure(fname, show=True, **savefig_kw):
+    """Save the current figure, then show it (interactive) or close it (batch, or show=False).
+
+    Besides `fname` this writes every format set with configure_export.
+    Encoding and writing happen on the figure writer's threads, so the next
+    section starts while they run; call WRITER.flush() before reading the
+    files back. In batch mode every open figure is closed, including the
+    empty ones left behind when pandas' .plot() opens its own, so memory
+    stays flat however many charts a run produces.
+    """
+    fig = plt.gcf()
+    start = _clock()
+    written = 0
+    if not _fast_path(fig, fname, savefig_kw):
+        drawn, paths = _savefig(fig, fname, savefig_kw)
+        written = sum(os.path.getsize(p) for p in paths if isinstance(p, str))
+    else:
+        drawn = _export(fig, fname)
+    end = _clock()
+    # save is what this thread spent on it: waiting for queue room, or the whole write for _savefig
+    TELEMETRY.record('render', wall_s=drawn[0] - start[0], cpu_s=drawn[1] - start[1])
+    TELEMETRY.record('save', wall_s=end[0] - drawn[0], cpu_s=end[1] - drawn[1], bytes_written=written)
+    if _batch:
+        plt.close('all')
+    elif show:
+        plt.show()
+    else:
+        plt.close(fig)
+    return fname
+
+
+def render_report(log=None):
+    """Per-figure render times, slowest first, as printable lines."""
+    log = RENDER_LOG if log is None else log
+    lines = [f"{seconds * 1000:8.1f} ms  {fname}" for fname, seconds in sorted(log, key=lambda r: -r[1])]
+    lines.append(f"{sum(s for _, s in log) * 1000:8.1f} ms  total ({len(log)} figures)")
+    return lines
+
+
+def categorical_scatter(x, y, labels, colors, markers, markersize=10, ax=None, proxy_kw=None, **scatter_kw):
+    """Draw labelled points with one collection per marker shape; returns the legend handles.
+
+    Point i is drawn with colors[i] and markers[i] (both repeat when shorter
+    than the points) and gets the legend entry labels[i]. The legend is built
+    from proxy artists that never touch the axes, so a chart holds one
+    artist per marker shape however many points it labels; pass the result
+    to plt.legend(handles=...). The points sit on the same layer as plot()
+    markers and look like plot(x, y, marker=m, color=c, markersize=markersize).
+    """
+    from matplotlib.colors import to_rgba_array
+    from matplotlib.lines import Line2D
+
+    ax = ax or plt.gca()
+    labels = list(labels)
+    n = len(labels)
+    x, y = np.asarray(x), np.asarray(y)
+    rgba = np.resize(to_rgba_array(list(colors)), (n, 4))
+    markers = np.resize(np.array(list(markers), dtype=object), n)
+    scatter_kw = {'zorder': 2, 'linewidths': plt.rcParams['lines.markeredgewidth'], **scatter_kw}
+    for marker in dict.fromkeys(markers):
+        idx = np.flatnonzero(markers == marker)
+        ax.scatter(x[idx], y[idx], s=markersize**2, c=rgba[idx], marker=marker, **scatter_kw)
+    proxy_kw = {'linestyle': 'None', **(proxy_kw or {})}
+    return [Line2D([], [], marker=m, color=c, markersize=markersize, label=label, **proxy_kw)
+            for label, c, m in zip(labels, rgba, markers)]
+
+
+def plot_species_distribution(period, species_count):
+    """Bar chart of occurrences per stage for one period, saved as {period}_species_distribution.png."""
+    fname = f"{period}_species_distribution.png"
+    plt.figure(figsize=(10,5))
+    species_count.plot(kind='bar', color='teal')
+    plt.title(f"Species Distribution in {period}")
+    plt.xlabel("Stage / Early Interval")
+    plt.ylabel("Number of Occurrences")
+    plt.xticks(rotation=90)
+    plt.tight_layout()
+    return finish_figure(fname, show=False)
+
+
+def _init_worker(export):
+    # Workers only ever write files, never open windows
+    set_batch_mode()
+    configure_export(**export)
+
+
+def _render_period(job):
+    with TELEMETRY.capture() as stages:
+        fname = plot_species_distribution(*job)
+        # Pool workers exit without running atexit, so write before reporting back
+        WRITER.flush()
+    return next(r for r in reversed(RENDER_LOG) if r[0] == fname), stages
+
+
+def render_species_distributions(period_counts, workers=1):
+    """Render every period's chart from the (period, stage) count table.
+
+    With workers > 1 the charts are drawn and PNG-encoded in a process pool;
+    each worker runs the same plotting code, so the files are identical to a
+    serial run. Returns the written file names in period order.
+    """
+    jobs = [(period, period_counts.loc[period]) for period in period_counts.index.unique(level=0)]
+    if workers <= 1 or len(jobs) <= 1:
+        return [plot_species_distribution(*job) for job in jobs]
+    # Forked workers must not inherit half-written queued figures
+    WRITER.flush()
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker,
+                             initargs=(export_settings(),)) as pool:
+        results = list(pool.map(_render_period, jobs))
+    records = [record for record, _ in results]
+    RENDER_LOG.extend(records)
+    for _, stages in results:
+        TELEMETRY.merge(stages)
+    return [fname for fname, _ in records]
@@ -0,0 +1,82 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cosmic_history.datasets import get_registry
+from cosmic_history.render import RENDER_LOG, configure_export, export_settings, set_batch_mode
+from cosmic_history.sections import SECTIONS, run_sections
+from cosmic_history.telemetry import TELEMETRY
+from cosmic_history.writer import WRITER
+
+
+def branches(sections, registry=None):
+    """Split `sections` into independent branches of the data-dependency DAG.
+
+    Sections are linked when they read the same dataset or the same file
+    (several datasets can come from one, like the PBDB columns), or when one
+    reads a file another writes. Files are known through
+    registry.source_path(), so without a registry only dataset names link.
+    Each connected group becomes one branch, kept in registration order, so
+    a shared dataset is loaded once in the branch that owns it and nothing
+    crosses between branches.
+    """
+    sections = list(sections)
+    parent = list(range(len(sections)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def files(s):
+        reads = [registry.source_path(name) for name in s.inputs if name in registry.loaders] if registry else []
+        return {os.path.normpath(path) for path in list(s.outputs) + reads if path}
+
+    owner = {}
+    for i, s in enumerate(sections):
+        for key in set(s.inputs) | files(s):
+            if key in owner:
+                parent[find(i)] = find(owner[key])
+            owner.setdefault(key, i)
+    groups = {}
+    for i, s in enumerate(sections):
+        groups.setdefault(find(i), []).append(s)
+    # Heaviest first: branches reading more datasets (the PBDB one) start before the cheap ones
+    return sorted(groups.values(), key=lambda g: (-len({k for s in g for k in s.inputs}), -len(g)))
+
+
+def _run_branch(names, data_dir, profile=(), export=None):
+    set_batch_mode()
+    configure_export(**(export or {}))
+    TELEMETRY.profile = set(profile)
+    logged, measured = len(RENDER_LOG), len(TELEMETRY.sections)
+    start = time.perf_counter()
+    run_sections([SECTIONS[n] for n in names], get_registry(data_dir))
+    # Pool workers exit without running atexit, so finish writing first
+    WRITER.flush()
+    # Workers are reused, so only hand back this branch's figures and telemetry
+    return names, time.perf_counter() - start, RENDER_LOG[logged:], TELEMETRY.sections[measured:]
+
+
+def run_parallel(sections, data_dir, workers=None):
+    """Run each branch in its own worker process; wall time is that of the slowest branch.
+
+    Workers always render headless. Returns [(section names, seconds)] per
+    branch in completion order and merges the workers' render logs into this
+    process's RENDER_LOG and TELEMETRY.
+    """
+    groups = branches(sections, get_registry(data_dir))
+    workers = min(workers or os.cpu_count() or 1, len(groups)) or 1
+    timings = []
+    WRITER.flush()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_branch, [s.name for s in g], data_dir, sorted(TELEMETRY.profile),
+                               export_settings())
+                   for g in groups]
+        for future in as_completed(futures):
+            names, seconds, log, measured = future.result()
+            timings.append((names, seconds))
+            RENDER_LOG.extend(log)
+            TELEMETRY.sections.extend(measured)
+    return timings
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+from cosmic_history.telemetry import TELEMETRY
+
+
+class Section:
+    """One analysis step: a callable plus the datasets it reads and the files it writes."""
+
+    def __init__(self, name, func, inputs=(), outputs=(), params=None, title=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        # Settings read from outside the function body, so the output cache can key on them
+        self.params = dict(params or {})
+        self.title = title or (func.__doc__ or name).strip().splitlines()[0]
+
+    def __call__(self, datasets):
+        return self.func(datasets)
+
+    def __repr__(self):
+        return f"Section({self.name!r}, inputs={list(self.inputs)}, outputs={list(self.outputs)})"
+
+
+# Registration order is the order a full run uses
+SECTIONS = OrderedDict()
+
+
+def section(name, inputs=(), outputs=(), params=None):
+    """Decorator registering `func(datasets)` as a section."""
+    def register(func):
+        SECTIONS[name] = Section(name, func, inputs, outputs, params)
+        return func
+    return register
+
+
+def select(only=None, skip=None):
+    """Sections to run, in registration order; `only`/`skip` are iterables of names."""
+    for names in (only, skip):
+        unknown = sorted(set(names or ()) - set(SECTIONS))
+        if unknown:
+            raise ValueError(f"unknown section(s) {', '.join(unknown)}; choose from {', '.join(SECTIONS)}")
+    chosen = [s for s in SECTIONS.values() if not only or s.name in only]
+    return [s for s in chosen if not skip or s.name not in skip]
+
+
+def run_sections(sections, datasets):
+    """Run `sections` in order, releasing each dataset after the last section that reads it."""
+    last_use = {}
+    for i, s in enumerate(sections):
+        for name in s.inputs:
+            last_use[name] = i
+    for i, s in enumerate(sections):
+        with TELEMETRY.section(s.name):
+            s(datasets)
+        for name in s.inputs:
+            if last_use[name] == i:
+                datasets.release(name)
+
+
+def parse_names(value):
+    """'sfr, cmb' -> ['sfr', 'cmb'] for the --only/--skip options."""
+    return [v.strip() for v in value.split(',') if v.strip()]
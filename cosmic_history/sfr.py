@@ -0,0 +1,161 @@
+"""Cosmic star-formation-rate density laws, SFRD(z) in M☉ yr⁻¹ Mpc⁻³.
+
+Every model is a plain numpy expression of z and its parameters, so both
+broadcast: pass a redshift grid of shape (n,) and parameters of shape (k,)
+(or (k, 1), ...) and evaluate() returns every parameter set on every
+redshift in one call, with shape params.shape + z.shape.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from cosmic_history.cosmology import Cosmology
+
+# Flat ΛCDM without radiation used to turn SFRD(z) into stellar mass (Madau & Dickinson 2014)
+H0 = 70.0
+OMEGA_M = 0.3
+COSMOLOGY = Cosmology(H0, OMEGA_M, Tcmb0=0, name='Madau & Dickinson (2014)')
+# Fraction of formed mass returned to the gas by stellar winds and SNe (Chabrier IMF)
+RETURN_FRACTION = 0.27
+
+# Redshift grid the cumulative quantities are tabulated on
+Z_MAX = 20.0
+Z_POINTS = 4001
+# Parameter sets whose ρ*(z) table each model keeps
+MASS_TABLE_CACHE = 64
+
+
+def double_power_law(z, a, b, c, d):
+    """a (1+z)^b / (1 + ((1+z)/c)^d): rises as (1+z)^b, turns over near z = c-1."""
+    return a * (1 + z)**b / (1 + ((1 + z)/c)**d)
+
+
+def inverse_double_power_law(z, a, c, d, e):
+    """a (1 + ((1+z)/c)^d) / (1+z)^e."""
+    return (a * (1 + ((1 + z)/c)**d)) / ((1 + z)**e)
+
+
+def power_law_exponential(z, a, b, c):
+    """a (1+z)^b exp(-z/c)."""
+    return a * (1 + z)**b * np.exp(-z/c)
+
+
+class SFRModel:
+    """A named SFRD(z) law with default parameters and its plot label."""
+
+    def __init__(self, name, func, params, label=None):
+        self.name = name
+        self.func = func
+        self.params = OrderedDict(params)
+        self.label = label or name
+        self._mass_tables = OrderedDict()
+
+    def _values(self, params):
+        extra = sorted(set(params) - set(self.params))
+        if extra:
+            raise TypeError(f"{self.name} has no parameter(s) {', '.join(extra)}")
+        return OrderedDict((k, params.get(k, v)) for k, v in self.params.items())
+
+    def evaluate(self, z, **params):
+        """SFRD at redshifts `z`; any parameter may be an array of parameter sets.
+
+        Parameter arrays get trailing axes for z, so the result has shape
+        broadcast(params).shape + np.shape(z).
+        """
+        z = np.asarray(z, dtype=float)
+        values = self._values(params)
+        if any(np.ndim(v) for v in values.values()):
+            values = {k: np.expand_dims(np.asarray(v, dtype=float), tuple(range(-z.ndim, 0)))
+                      for k, v in values.items()}
+        return self.func(z, **values)
+
+    __call__ = evaluate
+
+    def mass_table(self, **params):
+        """ρ*(z) on redshift_grid() for each parameter set, shape broadcast(params).shape + (Z_POINTS,).
+
+        One cumulative trapezoid over the whole grid gives every redshift at
+        once; tables are cached per parameter values.
+        """
+        values = self._values(params)
+        key = tuple((np.shape(v), np.asarray(v, dtype=float).tobytes()) for v in values.values())
+        table = self._mass_tables.get(key)
+        if table is None:
+            sfrd = self.evaluate(redshift_grid(), **values)
+            table = (1 - RETURN_FRACTION) * cumulative_from_top(sfrd * lookback_dt_dz(), redshift_grid())
+            table.setflags(write=False)
+            if len(self._mass_tables) >= MASS_TABLE_CACHE:
+                self._mass_tables.popitem(last=False)
+            self._mass_tables[key] = table
+        return table
+
+    def stellar_mass_density(self, z, **params):
+        """ρ*(z) in M☉ Mpc⁻³: mass formed before redshift z, less the returned fraction.
+
+        Interpolated from mass_table(), so evaluating many redshifts costs no
+        further integration.
+        """
+        return _interp_last_axis(np.asarray(z, dtype=float), redshift_grid(), self.mass_table(**params))
+
+    def __repr__(self):
+        return f"SFRModel({self.name!r}, {dict(self.params)})"
+
+
+@lru_cache(maxsize=None)
+def redshift_grid():
+    return np.linspace(0.0, Z_MAX, Z_POINTS)
+
+
+@lru_cache(maxsize=None)
+def lookback_dt_dz():
+    """|dt/dz| in years on the redshift grid for the flat ΛCDM above."""
+    return COSMOLOGY.dt_dz(redshift_grid())
+
+
+def cumulative_from_top(y, x):
+    """∫_x^x[-1] y dx' at every x, by the trapezoid rule along the last axis."""
+    segments = 0.5 * (y[..., 1:] + y[..., :-1]) * np.diff(x)
+    out = np.zeros_like(y)
+    out[..., :-1] = np.cumsum(segments[..., ::-1], axis=-1)[..., ::-1]
+    return out
+
+
+def _interp_last_axis(z, grid, table):
+    # np.interp for a stack of tables sharing one ascending grid
+    idx = np.clip(np.searchsorted(grid, z, side='right') - 1, 0, len(grid) - 2)
+    w = np.clip((z - grid[idx]) / (grid[idx + 1] - grid[idx]), 0.0, 1.0)
+    return table[..., idx] * (1 - w) + table[..., idx + 1] * w
+
+
+# Registration order is plot order
+SFR_MODELS = OrderedDict()
+
+
+def register_model(name, func, params, label=None):
+    SFR_MODELS[name] = model = SFRModel(name, func, params, label)
+    return model
+
+
+register_model('user', inverse_double_power_law, {'a': 0.0151, 'c': 2.9, 'd': 5.6, 'e': 2.7}, 'User Formula')
+register_model('madau', double_power_law, {'a': 0.01, 'b': 2.7, 'c': 2.9, 'd': 5.6}, 'Madau & Dickinson (2014) Fit')
+register_model('model_A', double_power_law, {'a': 0.02, 'b': 3, 'c': 5.0, 'd': 4}, 'Fitting Model A')
+register_model('model_B', power_law_exponential, {'a': 0.008, 'b': 2.5, 'c': 3.0}, 'Fitting Model B')
+
+# Column names of sfr_comparison_data.csv, by model
+COMPARISON_COLUMNS = OrderedDict([
+    ('user', 'User_Formula_SFR'),
+    ('madau', 'Madau_Simplified_SFR'),
+    ('model_A', 'Fitting_Model_A_SFR'),
+    ('model_B', 'Fitting_Model_B_SFR'),
+])
+
+
+def comparison_table(z=None):
+    """The sfr_comparison_data.csv table: every model on `z` (default 50 points over 0-10)."""
+    import pandas as pd
+    z = np.linspace(0, 10, 50) if z is None else np.asarray(z, dtype=float)
+    columns = OrderedDict([('Redshift', z)])
+    for name, column in COMPARISON_COLUMNS.items():
+        columns[column] = SFR_MODELS[name](z)
+    return pd.DataFrame(columns)
@@ -0,0 +1,208 @@
+"""Fit the SFR models of cosmic_history.sfr to the Madau & Dickinson (2014) points.
+
+Every step works on many parameter sets at once: the grid search evaluates
+the whole χ² surface as one broadcast array (in chunks), and the ensemble
+sampler evaluates all walkers of a half-ensemble in one call per step.
+Parameters are fitted in log space, so they stay positive.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cosmic_history.sfr import SFR_MODELS
+
+# Observed cosmic SFRD compilation plotted by the SFR section
+OBS_Z = np.array([0.05, 0.3, 0.5, 0.7, 1.0, 1.1, 1.75, 2.2, 2.3, 3.05,
+                  3.8, 4.9, 5.9, 7.0, 7.9, 7.0, 8.0])
+OBS_LOG_SFRD = np.array([-1.82, -1.50, -1.39, -1.20, -1.25, -1.02, -0.75, -0.87, -0.75, -0.97,
+                         -1.29, -1.42, -1.65, -1.79, -2.09, -2.00, -2.21])
+# The table has no error bars; assume 0.1 dex on every point
+LOG_SFRD_SIGMA = 0.1
+
+# Each parameter is searched and sampled within its default x/÷ this factor
+PRIOR_FACTOR = 10.0
+GRID_POINTS = 16
+GRID_CHUNK = 250_000
+
+
+def chi2(model, params, z=OBS_Z, log_sfrd=OBS_LOG_SFRD, sigma=LOG_SFRD_SIGMA):
+    """χ² in log SFRD for `params` (name -> value or array); shape is the parameters' broadcast shape."""
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        resid = (np.log10(model.evaluate(z, **params)) - log_sfrd) / sigma
+        total = np.sum(resid**2, axis=-1)
+    return np.where(np.isfinite(total), total, np.inf)
+
+
+def bounds(model):
+    """(low, high) per parameter: the prior range around the model's defaults."""
+    return {k: (v / PRIOR_FACTOR, v * PRIOR_FACTOR) for k, v in model.params.items()}
+
+
+def default_grid(model, points=GRID_POINTS):
+    return {k: np.geomspace(lo, hi, points) for k, (lo, hi) in bounds(model).items()}
+
+
+def grid_search(model, grid=None, chunk=GRID_CHUNK):
+    """χ² over the outer product of `grid` (name -> 1-d values); returns (best params, surface).
+
+    Parameters missing from `grid` keep their defaults. The surface is
+    evaluated `chunk` parameter sets at a time, each chunk as one array.
+    """
+    grid = default_grid(model) if grid is None else grid
+    names = list(grid)
+    axes = [np.asarray(grid[n], dtype=float) for n in names]
+    shape = tuple(len(a) for a in axes)
+    surface = np.empty(math.prod(shape))
+    for start in range(0, surface.size, chunk):
+        flat = np.arange(start, min(start + chunk, surface.size))
+        idx = np.unravel_index(flat, shape)
+        surface[flat] = chi2(model, {n: a[i] for n, a, i in zip(names, axes, idx)})
+    surface = surface.reshape(shape)
+    best = np.unravel_index(np.argmin(surface), shape)
+    return {**model.params, **{n: float(a[i]) for n, a, i in zip(names, axes, best)}}, surface
+
+
+def nelder_mead(f, x0, step=0.05, tol=1e-10, max_iter=5000):
+    """Minimise f(x) from x0 with the Nelder-Mead simplex; returns (x, f(x))."""
+    n = len(x0)
+    simplex = np.vstack([x0, x0 + step * np.eye(n)])
+    values = np.array([f(x) for x in simplex])
+    for _ in range(max_iter):
+        order = np.argsort(values)
+        simplex, values = simplex[order], values[order]
+        if values[-1] - values[0] <= tol * (abs(values[0]) + tol):
+            break
+        centroid = simplex[:-1].mean(axis=0)
+        reflected = centroid + (centroid - simplex[-1])
+        fr = f(reflected)
+        if fr < values[0]:
+            expanded = centroid + 2 * (centroid - simplex[-1])
+            fe = f(expanded)
+            simplex[-1], values[-1] = (expanded, fe) if fe < fr else (reflected, fr)
+        elif fr < values[-2]:
+            simplex[-1], values[-1] = reflected, fr
+        else:
+            contracted = centroid + 0.5 * (simplex[-1] - centroid)
+            fc = f(contracted)
+            if fc < values[-1]:
+                simplex[-1], values[-1] = contracted, fc
+            else:
+                simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+                values[1:] = [f(x) for x in simplex[1:]]
+    best = np.argmin(values)
+    return simplex[best], values[best]
+
+
+class _LogPosterior:
+    """log p(θ) for rows of θ = log(parameters): -χ²/2 inside the prior box, -inf outside."""
+
+    def __init__(self, model):
+        self.model = model
+        self.names = list(model.params)
+        lo, hi = zip(*(bounds(model)[n] for n in self.names))
+        self.low, self.high = np.log(lo), np.log(hi)
+
+    def __call__(self, theta):
+        theta = np.atleast_2d(theta)
+        inside = np.all((theta > self.low) & (theta < self.high), axis=1)
+        params = {n: np.exp(theta[:, j]) for j, n in enumerate(self.names)}
+        return np.where(inside, -0.5 * chi2(self.model, params), -np.inf)
+
+    def penalised_chi2(self, x):
+        # Finite everywhere, so the simplex can walk back into the prior box
+        clipped = np.clip(x, self.low, self.high)
+        value = chi2(self.model, {n: np.exp(clipped[j]) for j, n in enumerate(self.names)})
+        return min(float(value), 1e300) + 1e6 * float(np.sum((x - clipped)**2))
+
+
+def refine(model, start):
+    """Polish `start` with a local simplex search; returns (params, χ²)."""
+    log_post = _LogPosterior(model)
+    x0 = np.log([start[n] for n in log_post.names])
+    x, _ = nelder_mead(log_post.penalised_chi2, x0)
+    # Keep the result strictly inside the prior, where the sampler can start
+    span = log_post.high - log_post.low
+    x = np.clip(x, log_post.low + 1e-6 * span, log_post.high - 1e-6 * span)
+    return dict(zip(log_post.names, np.exp(x).tolist())), float(-2 * log_post(x)[0])
+
+
+def ensemble_mcmc(model, start, walkers=32, steps=2000, burn=500, stretch=2.0, seed=0):
+    """Affine-invariant ensemble sampler (Goodman & Weare stretch move) in log-parameter space.
+
+    Walkers start in a small ball around `start`. Each step updates the two
+    halves of the ensemble in turn, evaluating all proposals of a half in
+    one call. Returns ({name: samples}, acceptance fraction), dropping the
+    first `burn` steps.
+    """
+    log_post = _LogPosterior(model)
+    rng = np.random.default_rng(seed)
+    ndim = len(log_post.names)
+    pos = np.log([start[n] for n in log_post.names]) + 1e-3 * rng.standard_normal((walkers, ndim))
+    logp = log_post(pos)
+    chain = np.empty((steps, walkers, ndim))
+    halves = (np.arange(walkers // 2), np.arange(walkers // 2, walkers))
+    accepted = 0
+    for t in range(steps):
+        for active, other in (halves, halves[::-1]):
+            z = ((stretch - 1) * rng.random(len(active)) + 1)**2 / stretch
+            partners = pos[rng.choice(other, len(active))]
+            proposal = partners + z[:, None] * (pos[active] - partners)
+            lp = log_post(proposal)
+            with np.errstate(invalid='ignore'):
+                accept = np.log(rng.random(len(active))) < (ndim - 1) * np.log(z) + lp - logp[active]
+            pos[active[accept]] = proposal[accept]
+            logp[active[accept]] = lp[accept]
+            accepted += accept.sum()
+        chain[t] = pos
+    samples = np.exp(chain[burn:].reshape(-1, ndim))
+    return {n: samples[:, j] for j, n in enumerate(log_post.names)}, accepted / (steps * walkers)
+
+
+class FitResult:
+    """Best-fit parameters, their χ² and (when sampled) the posterior samples of one model."""
+
+    def __init__(self, name, params, chi2, samples=None, acceptance=None):
+        self.name = name
+        self.params = params
+        self.chi2 = chi2
+        self.dof = len(OBS_Z) - len(params)
+        self.samples = samples
+        self.acceptance = acceptance
+
+    def quantiles(self, q=(0.16, 0.5, 0.84)):
+        """{name: [q16, median, q84]} from the posterior samples."""
+        return {n: np.quantile(s, q).tolist() for n, s in (self.samples or {}).items()}
+
+    def table(self):
+        """One row per parameter: best fit, posterior median and 68% interval."""
+        quantiles = self.quantiles()
+        return [{'model': self.name, 'param': n, 'best': v, 'chi2': self.chi2, 'dof': self.dof,
+                 **dict(zip(('p16', 'median', 'p84'), quantiles.get(n, (math.nan,) * 3)))}
+                for n, v in self.params.items()]
+
+    def __repr__(self):
+        return f"FitResult({self.name!r}, chi2={self.chi2:.2f}/{self.dof}, {self.params})"
+
+
+def fit_model(name, grid_points=GRID_POINTS, walkers=32, steps=2000, burn=500, seed=0):
+    """Grid search, simplex refinement, then (if steps) ensemble MCMC for one registered model."""
+    model = SFR_MODELS[name]
+    start, _ = grid_search(model, default_grid(model, grid_points))
+    params, value = refine(model, start)
+    samples, acceptance = ensemble_mcmc(model, params, walkers, steps, burn, seed=seed) if steps else (None, None)
+    return FitResult(name, params, value, samples, acceptance)
+
+
+def fit_models(names=None, workers=1, **kw):
+    """fit_model for every registered model (or `names`), one process per model when workers > 1."""
+    names = list(SFR_MODELS if names is None else names)
+    if workers <= 1 or len(names) <= 1:
+        return [fit_model(n, **kw) for n in names]
+    with ProcessPoolExecutor(max_workers=min(workers, len(names))) as pool:
+        return list(pool.map(_fit_one, [(n, kw) for n in names]))
+
+
+def _fit_one(job):
+    name, kw = job
+    return fit_model(name, **kw)
@@ -0,0 +1,201 @@
+import os
+import numpy as np
+import pandas as pd
+
+from cosmic_history.pbdb import CHUNK_ROWS, iter_occurrence_chunks, pbdb_path
+
+# 2**14 one-byte registers = 16 KiB per sketch, ~0.8% standard error
+DEFAULT_PRECISION = 14
+
+
+def hash_values(values):
+    """64-bit hashes of the non-missing values plus the mask of rows they came from.
+
+    pandas' hash_array uses a fixed key, so the hashes are identical in every
+    process (unlike hash()) and sketches built in workers can be merged.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Hash each distinct name once and gather by code
+        codes = values.cat.codes.to_numpy()
+        cat_hashes = pd.util.hash_array(np.asarray(values.cat.categories, dtype=object))
+        return cat_hashes[codes[codes >= 0]], codes >= 0
+    present = values.notna().to_numpy()
+    return pd.util.hash_array(values[present].to_numpy(dtype=object)), present
+
+
+def _index_and_rank(hashes, p):
+    """Register index (top p bits) and rank (leading zeros of the rest, plus one)."""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    idx = (hashes >> np.uint64(64 - p)).astype(np.intp)
+    x = hashes << np.uint64(p)
+    zeros = np.zeros(len(x), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        top_clear = x < np.uint64(1 << (64 - shift))
+        zeros += np.where(top_clear, shift, 0).astype(np.uint8)
+        x = np.where(top_clear, x << np.uint64(shift), x)
+    zeros[x == 0] = 64
+    rank = np.minimum(zeros, 64 - p) + 1
+    return idx, rank.astype(np.uint8)
+
+
+def _estimate(registers):
+    """HyperLogLog cardinality estimate over the last axis, with the linear-counting small-range correction."""
+    registers = np.atleast_2d(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)), axis=-1)
+    empty = np.count_nonzero(registers == 0, axis=-1)
+    small = (raw <= 2.5 * m) & (empty > 0)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(empty, 1))
+    return np.where(small, linear, raw)
+
+
+class HyperLogLog:
+    """Approximate distinct counter (Flajolet et al. 2007, 64-bit hashes).
+
+    The relative standard error is about 1.04 / sqrt(2**precision): 1.6% at
+    p=12, 0.8% at p=14, 0.4% at p=16, so ~95% of estimates land within twice
+    that. Memory is 2**precision bytes regardless of how many values are
+    added. Two sketches of the same precision merge by taking the register
+    maximum, which gives exactly the sketch of the union of their inputs.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add(self, values):
+        hashes, _ = hash_values(values)
+        self.add_hashes(hashes)
+        return self
+
+    def add_hashes(self, hashes):
+        idx, rank = _index_and_rank(hashes, self.precision)
+        np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError(f"cannot merge precision {other.precision} into {self.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def __or__(self, other):
+        return HyperLogLog(self.precision, self.registers.copy()).merge(other)
+
+    def count(self):
+        return float(_estimate(self.registers)[0])
+
+    def to_bytes(self):
+        return bytes([self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(data[0], np.frombuffer(data[1:], dtype=np.uint8).copy())
+
+
+class GroupedSketches:
+    """One HyperLogLog per group label, stored as a (groups, registers) matrix."""
+
+    def __init__(self, precision=DEFAULT_PRECISION, labels=(), registers=None):
+        self.precision = precision
+        self.labels = list(labels)
+        self._pos = {label: i for i, label in enumerate(self.labels)}
+        m = 1 << precision
+        self.registers = np.zeros((len(self.labels), m), dtype=np.uint8) if registers is None else registers
+
+    def _positions(self, labels):
+        new = [label for label in pd.unique(np.asarray(labels, dtype=object)) if label not in self._pos]
+        if new:
+            for label in new:
+                self._pos[label] = len(self.labels)
+                self.labels.append(label)
+            grow = np.zeros((len(new), self.registers.shape[1]), dtype=np.uint8)
+            self.registers = np.vstack([self.registers, grow])
+        return np.array([self._pos[label] for label in labels], dtype=np.intp)
+
+    def update(self, groups, values):
+        """Add `values` to the sketch of the matching entry in `groups` (rows with a missing group or value are skipped)."""
+        groups = pd.Series(groups).reset_index(drop=True)
+        values = pd.Series(values).reset_index(drop=True)
+        keep = (groups.notna() & values.notna()).to_numpy()
+        hashes, _ = hash_values(values[keep])
+        return self.add_hashes(groups[keep], hashes)
+
+    def add_hashes(self, groups, hashes):
+        """Add precomputed hash_values() hashes, one per entry of `groups` (no missing groups)."""
+        groups = pd.Series(groups).astype('category')
+        rows = self._positions(list(groups.cat.categories))[groups.cat.codes.to_numpy()]
+        idx, rank = _index_and_rank(hashes, self.precision)
+        np.maximum.at(self.registers, (rows, idx), rank)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError(f"cannot merge precision {other.precision} into {self.precision}")
+        rows = self._positions(other.labels)
+        np.maximum.at(self.registers, rows, other.registers)
+        return self
+
+    def __getitem__(self, label):
+        return HyperLogLog(self.precision, self.registers[self._pos[label]].copy())
+
+    def rollup(self, mapping):
+        """Merge groups into coarser ones (e.g. stage -> period); unmapped groups are dropped."""
+        out = GroupedSketches(self.precision)
+        targets = [mapping.get(label) for label in self.labels]
+        keep = [i for i, t in enumerate(targets) if t is not None and not pd.isna(t)]
+        if keep:
+            rows = out._positions([targets[i] for i in keep])
+            np.maximum.at(out.registers, rows, self.registers[keep])
+        return out
+
+    def counts(self):
+        """Estimated distinct values per group."""
+        est = _estimate(self.registers) if len(self.labels) else np.array([])
+        return pd.Series(est, index=pd.Index(self.labels, dtype=object), name='distinct').sort_index()
+
+    def save(self, path):
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, precision=self.precision, labels=np.array(self.labels, dtype=str), registers=self.registers)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(int(data['precision']), data['labels'].tolist(), data['registers'].copy())
+
+
+def build_stage_sketches(path=None, taxon='accepted_name', precision=DEFAULT_PRECISION, chunksize=CHUNK_ROWS):
+    """Distinct-`taxon` sketches per early_interval, built chunk by chunk while streaming the CSV."""
+    sketches = GroupedSketches(precision)
+    for chunk in iter_occurrence_chunks(path, ['early_interval', taxon], chunksize):
+        sketches.update(chunk['early_interval'], chunk[taxon])
+    return sketches
+
+
+def load_stage_sketches(path=None, taxon='accepted_name', precision=DEFAULT_PRECISION):
+    """build_stage_sketches(), kept in the PBDB column cache and rebuilt when the CSV changes."""
+    from cosmic_history.pbdb_cache import OccurrenceCache
+    cache = OccurrenceCache(path or pbdb_path())
+    cache.validate()
+    fname = os.path.join(cache.cache_dir, f'hll.early_interval.{taxon}.p{precision}.npz')
+    if os.path.exists(fname):
+        return GroupedSketches.load(fname)
+    sketches = build_stage_sketches(cache.path, taxon, precision)
+    sketches.save(fname)
+    return sketches
+
+
+def stage_diversity(path=None, taxon='accepted_name', mapping=None, precision=DEFAULT_PRECISION):
+    """Estimated distinct `taxon` per early_interval and, given a {stage: period} mapping, per period.
+
+    The approximate counterpart of a per-stage nunique: the sketches come from
+    load_stage_sketches(), so after the first run this reads 2**precision bytes
+    per stage instead of the occurrences. Returns (per-stage Series, per-period
+    Series or None); both are within the HyperLogLog error bound above.
+    """
+    sketches = load_stage_sketches(path, taxon, precision)
+    return sketches.counts(), (sketches.rollup(mapping).counts() if mapping is not None else None)
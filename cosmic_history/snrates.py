@@ -0,0 +1,143 @@
+"""Supernova rates (SNe yr⁻¹ Mpc⁻³) derived from the SFR models of cosmic_history.sfr.
+
+Core-collapse SNe follow star formation with no delay: R_CC(z) = k_CC SFRD(z).
+Type Ia SNe follow it through a delay-time distribution (DTD):
+
+    R_Ia(t) = N_Ia ∫ SFRD(t - τ) DTD(τ) dτ
+
+which is evaluated as one FFT convolution on a uniform cosmic-time grid and
+interpolated back to redshift. SFR and DTD parameters broadcast as in
+SFRModel.evaluate, so a sweep over many DTD parameter sets is a single
+batched FFT.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from cosmic_history.sfr import COSMOLOGY, SFR_MODELS, Z_MAX, _interp_last_axis
+
+# Core-collapse SNe per solar mass formed (stars of 8-40 M☉, Salpeter IMF; Madau & Dickinson 2014)
+K_CC = 0.0068
+# Type Ia SNe per solar mass formed over a Hubble time (Maoz & Mannucci 2012)
+N_IA = 1.3e-3
+# 1σ uncertainties for rate_bands: the IMF-dependent efficiencies (dex) and the DTD slope
+K_CC_SIGMA_DEX = 0.2
+N_IA_SIGMA_DEX = 0.1
+BETA_SIGMA = 0.1
+# Draws for rate_bands, and draws per batched FFT (each holds a TIME_POINTS-long spectrum)
+BAND_DRAWS = 4096
+BAND_CHUNK = 256
+# Points of the uniform time grid from the Big Bang to today (~3.4 Myr apart)
+TIME_POINTS = 4096
+
+
+def power_law_dtd(tau, beta=1.1, t_min=0.04):
+    """τ^-β after the first white dwarfs explode at t_min (Gyr)."""
+    with np.errstate(divide='ignore'):
+        return np.where(tau >= t_min, tau**-beta, 0.0)
+
+
+def exponential_dtd(tau, tau_e=1.0, t_min=0.04):
+    """exp(-τ/τ_e) after t_min (Gyr)."""
+    return np.where(tau >= t_min, np.exp(-tau / tau_e), 0.0)
+
+
+def gaussian_dtd(tau, mean=3.4, sigma=0.68):
+    """A single delay of mean ± sigma Gyr (Strolger et al. 2004)."""
+    return np.exp(-0.5 * ((tau - mean) / sigma)**2)
+
+
+# Registration order is plot order
+DTD_MODELS = OrderedDict([
+    ('power_law', power_law_dtd),
+    ('exponential', exponential_dtd),
+    ('gaussian', gaussian_dtd),
+])
+
+
+@lru_cache(maxsize=None)
+def time_grid(points=TIME_POINTS):
+    """(t in Gyr, z(t)) on a uniform grid from t = 0 to today for the SFR cosmology."""
+    t = np.linspace(0.0, float(COSMOLOGY.age(0)), points)
+    z = COSMOLOGY.redshift(t)
+    t.setflags(write=False)
+    z.setflags(write=False)
+    return t, z
+
+
+def _with_time_axis(params):
+    # Parameter arrays get a trailing axis for the time grid
+    return {k: np.expand_dims(np.asarray(v, dtype=float), -1) if np.ndim(v) else v for k, v in params.items()}
+
+
+def sfr_history(model='madau', points=TIME_POINTS, **params):
+    """SFRD on time_grid(), shape broadcast(params).shape + (points,); zero before z = Z_MAX."""
+    _, z = time_grid(points)
+    with np.errstate(over='ignore', invalid='ignore'):
+        sfrd = SFR_MODELS[model](np.minimum(z, Z_MAX), **params)
+    return np.where(z <= Z_MAX, sfrd, 0.0)
+
+
+def dtd_kernel(dtd='power_law', points=TIME_POINTS, **params):
+    """The DTD on the grid's delays, normalised to unit integral over a Hubble time (Gyr⁻¹)."""
+    t, _ = time_grid(points)
+    kernel = DTD_MODELS[dtd](t, **_with_time_axis(params))
+    return kernel / (kernel.sum(axis=-1, keepdims=True) * (t[1] - t[0]))
+
+
+def convolve(history, kernel, dt):
+    """∫ history(t - τ) kernel(τ) dτ on the grid, as a zero-padded FFT; leading axes broadcast."""
+    n = history.shape[-1]
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(history, size) * np.fft.rfft(kernel, size)
+    return np.fft.irfft(spectrum, size)[..., :n] * dt
+
+
+def ccsn_rate(z, model='madau', efficiency=K_CC, **sfr_params):
+    """Core-collapse rate at redshifts z: efficiency × SFRD(z)."""
+    return efficiency * SFR_MODELS[model](z, **sfr_params)
+
+
+def ia_rate(z, model='madau', dtd='power_law', efficiency=N_IA, sfr_params=None, points=TIME_POINTS, **dtd_params):
+    """Type Ia rate at redshifts z: the SFR history convolved with the DTD.
+
+    SFR parameters (in sfr_params) and DTD parameters may both be arrays;
+    the result has shape broadcast(all parameters).shape + np.shape(z).
+    """
+    t, _ = time_grid(points)
+    history = sfr_history(model, points, **(sfr_params or {}))
+    rate = efficiency * convolve(history, dtd_kernel(dtd, points, **dtd_params), t[1] - t[0])
+    z = np.asarray(z, dtype=float)
+    return _interp_last_axis(COSMOLOGY.age(z), t, rate)
+
+
+def rate_table(z, model='madau', dtd='power_law', **dtd_params):
+    """z, Rate_CCSN and Rate_Ia columns, as in supernova_rates.csv."""
+    import pandas as pd
+    z = np.asarray(z, dtype=float)
+    return pd.DataFrame(OrderedDict([
+        ('z', z),
+        ('Rate_CCSN', ccsn_rate(z, model)),
+        ('Rate_Ia', ia_rate(z, model, dtd, **dtd_params)),
+    ]))
+
+
+def rate_bands(z, model='madau', draws=BAND_DRAWS, chunk=BAND_CHUNK, seed=0, **band_kw):
+    """(CCSN band, Ia band) at redshifts z, propagating the efficiency and β uncertainties.
+
+    The Ia band samples the power-law DTD's β, so every chunk of draws is
+    one batched FFT convolution.
+    """
+    from cosmic_history.uncertainty import lognormal, normal, propagate
+    z = np.asarray(z, dtype=float)
+    ccsn = propagate(lambda z, p: p['efficiency'][:, None] * SFR_MODELS[model](z),
+                     lognormal({'efficiency': K_CC}, K_CC_SIGMA_DEX), z, draws, seed=seed, **band_kw)
+    sample_beta = normal({'beta': 1.1}, {'beta': BETA_SIGMA})
+    sample_efficiency = lognormal({'efficiency': N_IA}, N_IA_SIGMA_DEX)
+
+    def ia(z, p):
+        return p['efficiency'][:, None] * ia_rate(z, model, 'power_law', efficiency=1.0, beta=p['beta'])
+    ia_band = propagate(ia, lambda rng, n: {**sample_beta(rng, n), **sample_efficiency(rng, n)},
+                        z, draws, chunk=chunk, seed=seed, **band_kw)
+    return ccsn, ia_band
@@ -0,0 +1,162 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Where a section's time goes; transform is whatever the other three don't account for
+STAGES = ('load', 'transform', 'render', 'save')
+# background_s is time spent writing files on the figure-writer threads, off the section's critical path
+MEASURES = ('wall_s', 'cpu_s', 'peak_rss_delta', 'rows', 'bytes_read', 'bytes_written', 'background_s', 'calls')
+
+
+def peak_rss():
+    """High-water resident set size of this process in bytes (0 where unavailable)."""
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _sample():
+    return time.perf_counter(), time.process_time(), peak_rss()
+
+
+def _empty_stages():
+    return {stage: dict.fromkeys(MEASURES, 0) for stage in STAGES}
+
+
+def _add(into, measures):
+    for k, v in measures.items():
+        into[k] = into.get(k, 0) + v
+
+
+class Telemetry:
+    """Wall time, CPU time, peak-RSS growth, rows and bytes per section and stage.
+
+    run_sections wraps each section in section(); DatasetRegistry.get reports
+    loads and finish_figure reports render (matplotlib drawing the figure)
+    and save (what saving cost the section itself; the encoding and writing
+    done by the figure writer shows up as background_s once it finishes),
+    so sections need no changes.
+    CPU time is this process's only; peak_rss_delta is how far the process's
+    memory high-water mark rose, so it is 0 for a stage that stayed under an
+    earlier peak. Sections named in `profile` also run under cProfile and
+    their stats are dumped to <profile_dir>/<section>.prof.
+    """
+
+    def __init__(self):
+        self.sections = []
+        self.profile = set()
+        self.profile_dir = '.'
+        self._stages = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """The running section's stages, for records that arrive later from another thread."""
+        return self._stages
+
+    def record(self, stage, into=None, **measures):
+        """Add measures (wall_s=, rows=, ...) to `stage` of the running section (or of `into`), if any."""
+        stages = self._stages if into is None else into
+        if stages is not None:
+            measures.setdefault('calls', 1)
+            with self._lock:
+                _add(stages[stage], measures)
+
+    @contextmanager
+    def stage(self, stage):
+        """Time a block as `stage`; the yielded dict takes extra measures such as rows."""
+        extra = {}
+        start = _sample()
+        try:
+            yield extra
+        finally:
+            end = _sample()
+            self.record(stage, wall_s=end[0] - start[0], cpu_s=end[1] - start[1],
+                        peak_rss_delta=end[2] - start[2], **extra)
+
+    @contextmanager
+    def capture(self):
+        """Collect the stages recorded inside the block into the yielded dict instead.
+
+        Used in worker processes, whose measures are shipped back and merged
+        into the parent's running section with merge().
+        """
+        outer, self._stages = self._stages, _empty_stages()
+        try:
+            yield self._stages
+        finally:
+            self._stages = outer
+
+    def merge(self, stages):
+        if self._stages is not None:
+            with self._lock:
+                for stage, measures in stages.items():
+                    _add(self._stages[stage], measures)
+
+    @contextmanager
+    def section(self, name):
+        profiler = cProfile.Profile() if name in self.profile else None
+        start = _sample()
+        with self.capture() as stages:
+            if profiler:
+                profiler.enable()
+            try:
+                yield
+            finally:
+                if profiler:
+                    profiler.disable()
+        end = _sample()
+        record = {'section': name, 'pid': os.getpid(), 'wall_s': end[0] - start[0],
+                  'cpu_s': end[1] - start[1], 'peak_rss_delta': end[2] - start[2],
+                  'rows': stages['load']['rows'], 'bytes_read': stages['load']['bytes_read'],
+                  'bytes_written': stages['save']['bytes_written']}
+        transform = stages['transform']
+        for k in ('wall_s', 'cpu_s'):
+            # Render workers run in parallel, so their summed time can exceed the section's
+            transform[k] += max(0.0, record[k] - sum(stages[s][k] for s in STAGES if s != 'transform'))
+        transform['calls'] += 1
+        record['stages'] = stages
+        if profiler:
+            record['profile'] = os.path.join(self.profile_dir, f"{name}.prof")
+            profiler.dump_stats(record['profile'])
+        self.sections.append(record)
+
+    def report(self, sections=None):
+        """The JSON-ready report: every section plus per-stage totals."""
+        sections = self.sections if sections is None else sections
+        totals = _empty_stages()
+        for s in sections:
+            # Background writes may have finished after the section did
+            s['bytes_written'] = s['stages']['save']['bytes_written']
+            for stage, measures in s['stages'].items():
+                _add(totals[stage], measures)
+        return {'sections': sections, 'totals': totals}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=1)
+        return path
+
+    def summary(self):
+        """One line per section, slowest first, with the wall time split by stage."""
+        lines = [f"{'section':16}{'wall':>9}{'cpu':>9}{'rss+':>9}" + ''.join(f"{s:>11}" for s in STAGES)
+                 + f"{'background':>11}"]
+        for s in sorted(self.sections, key=lambda r: -r['wall_s']):
+            lines.append(f"{s['section']:16}{s['wall_s']:8.2f}s{s['cpu_s']:8.2f}s{s['peak_rss_delta'] / 2**20:7.0f}MB"
+                         + ''.join(f"{s['stages'][st]['wall_s']:10.2f}s" for st in STAGES)
+                         + f"{s['stages']['save']['background_s']:10.2f}s")
+        return lines
+
+
+# Shared by run_sections, the dataset registry and finish_figure in this process
+TELEMETRY = Telemetry()
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+# International Chronostratigraphic Chart (ICS v2023/09), ages in Ma.
+# (period, max_ma, min_ma, [(epoch, max_ma, min_ma, [(age, max_ma, min_ma), ...]), ...])
+# An epoch without ages (Pridoli) is its own finest unit.
+PHANEROZOIC = [
+    ('Quaternary', 2.58, 0.0, [
+        ('Holocene', 0.0117, 0.0, [
+            ('Meghalayan', 0.0042, 0.0), ('Northgrippian', 0.0082, 0.0042), ('Greenlandian', 0.0117, 0.0082)]),
+        ('Pleistocene', 2.58, 0.0117, [
+            ('Late Pleistocene', 0.129, 0.0117), ('Chibanian', 0.774, 0.129),
+            ('Calabrian', 1.80, 0.774), ('Gelasian', 2.58, 1.80)]),
+    ]),
+    ('Neogene', 23.03, 2.58, [
+        ('Pliocene', 5.333, 2.58, [('Piacenzian', 3.600, 2.58), ('Zanclean', 5.333, 3.600)]),
+        ('Miocene', 23.03, 5.333, [
+            ('Messinian', 7.246, 5.333), ('Tortonian', 11.63, 7.246), ('Serravallian', 13.82, 11.63),
+            ('Langhian', 15.97, 13.82), ('Burdigalian', 20.44, 15.97), ('Aquitanian', 23.03, 20.44)]),
+    ]),
+    ('Paleogene', 66.0, 23.03, [
+        ('Oligocene', 33.9, 23.03, [('Chattian', 27.82, 23.03), ('Rupelian', 33.9, 27.82)]),
+        ('Eocene', 56.0, 33.9, [
+            ('Priabonian', 37.71, 33.9), ('Bartonian', 41.2, 37.71),
+            ('Lutetian', 47.8, 41.2), ('Ypresian', 56.0, 47.8)]),
+        ('Paleocene', 66.0, 56.0, [('Thanetian', 59.2, 56.0), ('Selandian', 61.6, 59.2), ('Danian', 66.0, 61.6)]),
+    ]),
+    ('Cretaceous', 145.0, 66.0, [
+        ('Late Cretaceous', 100.5, 66.0, [
+            ('Maastrichtian', 72.1, 66.0), ('Campanian', 83.6, 72.1), ('Santonian', 86.3, 83.6),
+            ('Coniacian', 89.8, 86.3), ('Turonian', 93.9, 89.8), ('Cenomanian', 100.5, 93.9)]),
+        ('Early Cretaceous', 145.0, 100.5, [
+            ('Albian', 113.0, 100.5), ('Aptian', 121.4, 113.0), ('Barremian', 125.77, 121.4),
+            ('Hauterivian', 132.6, 125.77), ('Valanginian', 139.8, 132.6), ('Berriasian', 145.0, 139.8)]),
+    ]),
+    ('Jurassic', 201.4, 145.0, [
+        ('Late Jurassic', 161.5, 145.0, [
+            ('Tithonian', 149.2, 145.0), ('Kimmeridgian', 154.8, 149.2), ('Oxfordian', 161.5, 154.8)]),
+        ('Middle Jurassic', 174.7, 161.5, [
+            ('Callovian', 165.3, 161.5), ('Bathonian', 168.2, 165.3),
+            ('Bajocian', 170.9, 168.2), ('Aalenian', 174.7, 170.9)]),
+        ('Early Jurassic', 201.4, 174.7, [
+            ('Toarcian', 184.2, 174.7), ('Pliensbachian', 192.9, 184.2),
+            ('Sinemurian', 199.5, 192.9), ('Hettangian', 201.4, 199.5)]),
+    ]),
+    ('Triassic', 251.902, 201.4, [
+        ('Late Triassic', 237.0, 201.4, [('Rhaetian', 208.5, 201.4), ('Norian', 227.0, 208.5), ('Carnian', 237.0, 227.0)]),
+        ('Middle Triassic', 247.2, 237.0, [('Ladinian', 242.0, 237.0), ('Anisian', 247.2, 242.0)]),
+        ('Early Triassic', 251.902, 247.2, [('Olenekian', 251.2, 247.2), ('Induan', 251.902, 251.2)]),
+    ]),
+    ('Permian', 298.9, 251.902, [
+        ('Lopingian', 259.51, 251.902, [('Changhsingian', 254.14, 251.902), ('Wuchiapingian', 259.51, 254.14)]),
+        ('Guadalupian', 273.01, 259.51, [
+            ('Capitanian', 264.28, 259.51), ('Wordian', 266.9, 264.28), ('Roadian', 273.01, 266.9)]),
+        ('Cisuralian', 298.9, 273.01, [
+            ('Kungurian', 283.5, 273.01), ('Artinskian', 290.1, 283.5),
+            ('Sakmarian', 293.52, 290.1), ('Asselian', 298.9, 293.52)]),
+    ]),
+    ('Carboniferous', 358.9, 298.9, [
+        ('Pennsylvanian', 323.2, 298.9, [
+            ('Gzhelian', 303.7, 298.9), ('Kasimovian', 307.0, 303.7),
+            ('Moscovian', 315.2, 307.0), ('Bashkirian', 323.2, 315.2)]),
+        ('Mississippian', 358.9, 323.2, [
+            ('Serpukhovian', 330.9, 323.2), ('Visean', 346.7, 330.9), ('Tournaisian', 358.9, 346.7)]),
+    ]),
+    ('Devonian', 419.2, 358.9, [
+        ('Late Devonian', 382.7, 358.9, [('Famennian', 372.2, 358.9), ('Frasnian', 382.7, 372.2)]),
+        ('Middle Devonian', 393.3, 382.7, [('Givetian', 387.7, 382.7), ('Eifelian', 393.3, 387.7)]),
+        ('Early Devonian', 419.2, 393.3, [
+            ('Emsian', 407.6, 393.3), ('Pragian', 410.8, 407.6), ('Lochkovian', 419.2, 410.8)]),
+    ]),
+    ('Silurian', 443.8, 419.2, [
+        ('Pridoli', 423.0, 419.2, []),
+        ('Ludlow', 427.4, 423.0, [('Ludfordian', 425.6, 423.0), ('Gorstian', 427.4, 425.6)]),
+        ('Wenlock', 433.4, 427.4, [('Homerian', 430.5, 427.4), ('Sheinwoodian', 433.4, 430.5)]),
+        ('Llandovery', 443.8, 433.4, [
+            ('Telychian', 438.5, 433.4), ('Aeronian', 440.8, 438.5), ('Rhuddanian', 443.8, 440.8)]),
+    ]),
+    ('Ordovician', 485.4, 443.8, [
+        ('Late Ordovician', 458.4, 443.8, [
+            ('Hirnantian', 445.2, 443.8), ('Katian', 453.0, 445.2), ('Sandbian', 458.4, 453.0)]),
+        ('Middle Ordovician', 470.0, 458.4, [('Darriwilian', 467.3, 458.4), ('Dapingian', 470.0, 467.3)]),
+        ('Early Ordovician', 485.4, 470.0, [('Floian', 477.7, 470.0), ('Tremadocian', 485.4, 477.7)]),
+    ]),
+    ('Cambrian', 538.8, 485.4, [
+        ('Furongian', 497.0, 485.4, [
+            ('Stage 10', 489.5, 485.4), ('Jiangshanian', 494.2, 489.5), ('Paibian', 497.0, 494.2)]),
+        ('Miaolingian', 509.0, 497.0, [
+            ('Guzhangian', 500.5, 497.0), ('Drumian', 504.5, 500.5), ('Wuliuan', 509.0, 504.5)]),
+        ('Series 2', 521.0, 509.0, [('Stage 4', 514.0, 509.0), ('Stage 3', 521.0, 514.0)]),
+        ('Terreneuvian', 538.8, 521.0, [('Stage 2', 529.0, 521.0), ('Fortunian', 538.8, 529.0)]),
+    ]),
+]
+
+# Precambrian periods and eras; the sections lump them into one 'Precambrian' period
+PRECAMBRIAN = [
+    ('Ediacaran', 635.0, 538.8), ('Cryogenian', 720.0, 635.0), ('Tonian', 1000.0, 720.0),
+    ('Stenian', 1200.0, 1000.0), ('Ectasian', 1400.0, 1200.0), ('Calymmian', 1600.0, 1400.0),
+    ('Statherian', 1800.0, 1600.0), ('Orosirian', 2050.0, 1800.0), ('Rhyacian', 2300.0, 2050.0),
+    ('Siderian', 2500.0, 2300.0), ('Neoarchean', 2800.0, 2500.0), ('Mesoarchean', 3200.0, 2800.0),
+    ('Paleoarchean', 3600.0, 3200.0), ('Eoarchean', 4031.0, 3600.0), ('Hadean', 4567.0, 4031.0),
+]
+
+# Units spanning several periods: they have an age range but no single period
+SPANNING = [
+    ('Cenozoic', 'era', 66.0, 0.0), ('Mesozoic', 'era', 251.902, 66.0), ('Paleozoic', 'era', 538.8, 251.902),
+    ('Phanerozoic', 'eon', 538.8, 0.0), ('Tertiary', 'period', 66.0, 2.58),
+]
+
+# Informal and regional names used by PBDB, mapped onto the ICS unit they correspond to
+ALIASES = {
+    'Tremadoc': 'Tremadocian', 'Arenig': 'Floian', 'Kinderhookian': 'Tournaisian', 'Delamaran': 'Stage 4',
+    'Early Cambrian': 'Series 2', 'Middle Cambrian': 'Miaolingian', 'Late Cambrian': 'Furongian',
+    'Middle Pleistocene': 'Chibanian', 'Early Pleistocene': 'Calabrian', 'Upper Pleistocene': 'Late Pleistocene',
+    'Proterozoic': 'Precambrian', 'Archean': 'Precambrian', 'Neoproterozoic': 'Precambrian',
+}
+
+
+def _compile_units():
+    rows = []
+    for period, p_max, p_min, epochs in PHANEROZOIC:
+        rows.append((period, 'period', period, None, p_max, p_min, False))
+        for epoch, e_max, e_min, ages in epochs:
+            rows.append((epoch, 'epoch', period, epoch, e_max, e_min, not ages))
+            for age, a_max, a_min in ages:
+                rows.append((age, 'age', period, epoch, a_max, a_min, True))
+    for name, u_max, u_min in PRECAMBRIAN:
+        rows.append((name, 'period', 'Precambrian', None, u_max, u_min, True))
+    rows.append(('Precambrian', 'supereon', 'Precambrian', None, 4567.0, 538.8, False))
+    for name, rank, u_max, u_min in SPANNING:
+        rows.append((name, rank, None, None, u_max, u_min, False))
+    table = pd.DataFrame(rows, columns=['name', 'rank', 'period', 'epoch', 'max_ma', 'min_ma', 'finest'])
+    return table.set_index('name')
+
+
+class Timescale:
+    """Compiled chronostratigraphic lookup.
+
+    `table` maps every unit name to (rank, period, epoch, max_ma, min_ma).
+    The finest units (ages, plus Pridoli and the Precambrian periods/eras)
+    tile 0-4567 Ma without gaps, so their lower boundaries form one sorted
+    array and any numeric age resolves with a single searchsorted. Names are
+    resolved once per distinct category, then gathered by code.
+    """
+
+    def __init__(self, aliases=ALIASES):
+        self.table = _compile_units()
+        self.aliases = dict(aliases)
+        finest = self.table[self.table['finest']].sort_values('min_ma')
+        self.finest = finest
+        self._lower = finest['min_ma'].to_numpy()
+        self._upper = finest['max_ma'].to_numpy()
+        self.periods = list(pd.unique(finest['period'].iloc[::-1]))
+        self._period_of_unit = pd.Categorical(finest['period'], categories=self.periods)
+
+    def resolve(self, name):
+        """The ICS row for a name or alias (KeyError if unknown)."""
+        return self.table.loc[self.aliases.get(name, name)]
+
+    def name_to_period(self):
+        """{name: period} for every unit and alias that lies within one period."""
+        mapping = self.table['period'].dropna().to_dict()
+        for alias, target in self.aliases.items():
+            if target in mapping:
+                mapping[alias] = mapping[target]
+        return mapping
+
+    def _categorical(self, values):
+        cats = pd.Categorical(values, categories=self.periods)
+        return pd.Series(cats)
+
+    def periods_for_names(self, intervals):
+        """Period of each interval name, via its categorical codes (NaN where not a single period)."""
+        intervals = pd.Series(intervals)
+        if not isinstance(intervals.dtype, pd.CategoricalDtype):
+            intervals = intervals.astype('category')
+        mapping = self.name_to_period()
+        per_category = np.array([mapping.get(c) for c in intervals.cat.categories] + [None], dtype=object)
+        out = self._categorical(per_category[intervals.cat.codes.to_numpy()])
+        out.index = intervals.index
+        return out
+
+    def units_for_ages(self, ages):
+        """Position in `finest` of the unit containing each age (-1 outside 0-4567 Ma or NaN)."""
+        ages = np.asarray(ages, dtype=np.float64)
+        pos = np.searchsorted(self._lower, ages, side='right') - 1
+        inside = (pos >= 0) & (ages <= self._upper[np.clip(pos, 0, None)])
+        return np.where(inside, pos, -1)
+
+    def periods_for_ages(self, ages):
+        pos = self.units_for_ages(ages)
+        codes = np.where(pos >= 0, self._period_of_unit.codes[np.clip(pos, 0, None)], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=self.periods))
+
+    def assign_periods(self, intervals, max_ma=None, min_ma=None):
+        """Period per row: by name where it names a single period, else by the midpoint of [min_ma, max_ma]."""
+        by_name = self.periods_for_names(intervals)
+        if max_ma is None or min_ma is None:
+            return by_name
+        missing = by_name.isna().to_numpy()
+        if missing.any():
+            mid = (np.asarray(max_ma, dtype=np.float64)[missing] + np.asarray(min_ma, dtype=np.float64)[missing]) / 2
+            codes = by_name.cat.codes.to_numpy().copy()
+            codes[missing] = self.periods_for_ages(mid).cat.codes.to_numpy()
+            by_name = pd.Series(pd.Categorical.from_codes(codes, categories=self.periods), index=by_name.index)
+        return by_name
+
+
+ICS = Timescale()
@@ -0,0 +1,161 @@
+"""Monte-Carlo uncertainty bands for model curves.
+
+propagate() draws parameter sets, evaluates the curve for a chunk of draws
+at a time and feeds each chunk to per-point streaming quantile estimators,
+so memory is bounded by the chunk, not the number of draws: 10⁶ draws of a
+300-point curve never hold more than MAX_CHUNK_BYTES of curve values.
+"""
+import numpy as np
+
+QUANTILES = (0.16, 0.5, 0.84)
+DRAWS = 100_000
+# Curve values evaluated per chunk
+MAX_CHUNK_BYTES = 32 * 2**20
+# Histogram bins per curve point; the quantiles are interpolated within a bin
+HISTOGRAM_BINS = 2048
+# The histogram range is the first chunk's range, widened by this fraction on each side
+RANGE_MARGIN = 0.5
+
+
+class StreamingQuantiles:
+    """Quantiles of every column of a stream of (draws, columns) chunks.
+
+    Each column keeps a fixed histogram whose range is set by the first
+    chunk (plus RANGE_MARGIN), so memory is columns × bins whatever the
+    number of draws. Values that later fall outside the range land in the
+    end bins and are counted in `clipped`. With log=True the histogram is
+    over log10 of the values, which suits curves spanning decades.
+    Non-finite values are skipped.
+    """
+
+    def __init__(self, quantiles=QUANTILES, bins=HISTOGRAM_BINS, log=False):
+        self.quantiles = tuple(quantiles)
+        self.bins = bins
+        self.log = log
+        self.low = self.high = self.counts = None
+        self.n = None
+        self.total = None
+        self.clipped = 0
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # A fresh array either way, so the binning below can work in place
+            values = np.log10(chunk) if self.log else chunk.copy()
+        finite = np.isfinite(values)
+        if self.counts is None:
+            self._start(values, finite)
+        # Bin positions in place; non-finite values go to a spare bin past the end
+        values -= self.low
+        values *= self.bins / (self.high - self.low)
+        self.clipped += int(np.count_nonzero(values < 0) + np.count_nonzero(values >= self.bins))
+        np.clip(values, 0, self.bins - 1, out=values)
+        idx = np.where(finite, values, 0).astype(np.intp)
+        idx += np.arange(values.shape[1]) * self.bins
+        idx[~finite] = self.counts.size
+        self.counts += np.bincount(idx.ravel(), minlength=self.counts.size + 1)[:-1].reshape(self.counts.shape)
+        self.n += finite.sum(axis=0)
+        self.total += np.where(finite, chunk, 0.0).sum(axis=0)
+
+    def _start(self, values, finite):
+        columns = values.shape[1]
+        with np.errstate(invalid='ignore'):
+            low = np.nanmin(np.where(finite, values, np.nan), axis=0)
+            high = np.nanmax(np.where(finite, values, np.nan), axis=0)
+        low, high = np.nan_to_num(low), np.nan_to_num(high)
+        pad = np.maximum(RANGE_MARGIN * (high - low), 1e-12 * np.maximum(1.0, np.abs(low)))
+        self.low, self.high = low - pad, high + pad
+        self.counts = np.zeros((columns, self.bins), dtype=np.int64)
+        self.n = np.zeros(columns)
+        self.total = np.zeros(columns)
+
+    def mean(self):
+        with np.errstate(invalid='ignore'):
+            return self.total / self.n
+
+    def result(self):
+        """{q: per-column value} interpolated linearly within the bin where the CDF crosses q."""
+        cdf = np.cumsum(self.counts, axis=1)
+        width = (self.high - self.low) / self.bins
+        columns = np.arange(self.counts.shape[0])
+        out = {}
+        for q in self.quantiles:
+            target = q * self.n
+            k = np.minimum((cdf < target[:, None]).sum(axis=1), self.bins - 1)
+            below = np.where(k > 0, cdf[columns, k - 1], 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                frac = np.clip((target - below) / self.counts[columns, k], 0.0, 1.0)
+            value = self.low + (k + np.nan_to_num(frac)) * width
+            value = np.where(self.n > 0, value, np.nan)
+            out[q] = 10**value if self.log else value
+        return out
+
+
+class Band:
+    """A curve's quantiles at each x: lower/median/upper for fill_between and plot."""
+
+    def __init__(self, x, quantiles, mean, draws, clipped=0):
+        self.x = np.asarray(x)
+        self.quantiles = quantiles
+        qs = sorted(quantiles)
+        self.lower = quantiles[qs[0]]
+        self.upper = quantiles[qs[-1]]
+        self.median = quantiles.get(0.5)
+        self.mean = mean
+        self.draws = draws
+        self.clipped = clipped
+
+    def fill_between(self, ax=None, **kw):
+        if ax is None:
+            import matplotlib.pyplot as plt
+            ax = plt.gca()
+        return ax.fill_between(self.x, self.lower, self.upper, **kw)
+
+    def __repr__(self):
+        return f"Band({len(self.x)} points, {self.draws} draws, quantiles {sorted(self.quantiles)})"
+
+
+def lognormal(params, sigma_dex):
+    """Sampler drawing each parameter as value × 10^N(0, sigma) (sigma_dex: number or name -> dex)."""
+    sigma = sigma_dex if isinstance(sigma_dex, dict) else dict.fromkeys(params, sigma_dex)
+
+    def sample(rng, n):
+        return {k: v * 10**(rng.standard_normal(n) * sigma.get(k, 0.0)) for k, v in params.items()}
+    return sample
+
+
+def normal(params, sigma):
+    """Sampler drawing each parameter from N(value, sigma[name]); parameters without a sigma stay fixed."""
+    def sample(rng, n):
+        return {k: v + rng.standard_normal(n) * sigma.get(k, 0.0) for k, v in params.items()}
+    return sample
+
+
+def resample(samples):
+    """Sampler drawing rows of posterior samples ({name: array}, e.g. FitResult.samples) with replacement."""
+    names = list(samples)
+    size = len(samples[names[0]])
+
+    def sample(rng, n):
+        rows = rng.integers(size, size=n)
+        return {k: np.asarray(samples[k])[rows] for k in names}
+    return sample
+
+
+def propagate(curve, sampler, x, draws=DRAWS, quantiles=QUANTILES, chunk=None, seed=0, log=False,
+              bins=HISTOGRAM_BINS):
+    """Band of curve(x, params) over `draws` parameter sets from sampler(rng, n).
+
+    curve must return shape (n, len(x)) for n parameter sets, as
+    SFRModel.evaluate does for parameter arrays. chunk (draws per
+    evaluation) defaults to what fits in MAX_CHUNK_BYTES of curve values;
+    pass a smaller one when the curve needs more working memory than its
+    output.
+    """
+    x = np.asarray(x, dtype=float)
+    chunk = chunk or max(1, MAX_CHUNK_BYTES // (8 * x.size))
+    rng = np.random.default_rng(seed)
+    stream = StreamingQuantiles(quantiles, bins, log)
+    for start in range(0, draws, chunk):
+        stream.update(curve(x, sampler(rng, min(chunk, draws - start))))
+    return Band(x, stream.result(), stream.mean(), draws, stream.clipped)
@@ -0,0 +1,99 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+# Writer threads; 0 writes inline, as plain savefig did
+WRITER_THREADS = 2
+# Writes allowed to wait in the queue. Each holds a copy of a rendered chart
+# (~13 MB for the 2400x1400 SFR figure), so this bounds the memory they use
+MAX_PENDING = 8
+
+
+class FigureWriter:
+    """Writes finished charts on background threads so the next section can start.
+
+    submit() queues a write (usually PNG-encoding a copied pixel buffer) and
+    returns at once, unless max_pending writes are already waiting; then it
+    blocks until one finishes, so a fast producer can't pile up rendered
+    buffers. flush() waits until everything queued is on disk and re-raises
+    the first failure. It runs at exit, so a normal exit never loses a file,
+    but worker processes end without atexit and must flush themselves.
+    """
+
+    def __init__(self, threads=WRITER_THREADS, max_pending=MAX_PENDING):
+        self.threads = threads
+        self.max_pending = max_pending
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = None
+        self._errors = []
+
+    def _start(self):
+        self._queue = queue.Queue(self.max_pending)
+        for i in range(self.threads):
+            threading.Thread(target=self._run, args=(self._queue,), name=f'figure-writer-{i}', daemon=True).start()
+
+    def _run(self, jobs):
+        while True:
+            item = jobs.get()
+            if item is None:
+                jobs.task_done()
+                return
+            func, args, done = item
+            try:
+                result = func(*args)
+                if done:
+                    done(result)
+            except BaseException as e:
+                self._errors.append(e)
+            finally:
+                jobs.task_done()
+
+    def _check_process(self):
+        # A forked child inherits the queue but not the threads serving it
+        if self._pid != os.getpid():
+            self._reset()
+
+    def submit(self, func, *args, done=None):
+        """Queue func(*args), then done(result) on the writer thread; returns seconds spent waiting for room."""
+        if self.threads <= 0:
+            result = func(*args)
+            if done:
+                done(result)
+            return 0.0
+        self._check_process()
+        if self._queue is None:
+            self._start()
+        start = time.perf_counter()
+        self._queue.put((func, args, done))
+        return time.perf_counter() - start
+
+    def flush(self):
+        """Block until every queued write has finished."""
+        self._check_process()
+        if self._queue is not None:
+            self._queue.join()
+        if self._errors:
+            errors, self._errors = self._errors, []
+            raise errors[0]
+
+    def configure(self, threads=None, max_pending=None):
+        """Change the thread count or queue bound; pending writes are flushed first."""
+        self.flush()
+        if self._queue is not None:
+            for _ in range(self.threads):
+                self._queue.put(None)
+            self._queue = None
+        if threads is not None:
+            self.threads = threads
+        if max_pending is not None:
+            self.max_pending = max_pending
+
+
+# Shared by every finish_figure call in this process
+WRITER = FigureWriter()
+atexit.register(WRITER.flush)
@@ -0,0 +1,41 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'pbdb')
+
+
+class PBDBStandIn(BaseHTTPRequestHandler):
+    """Serves <root>/full_<page>.csv, or delta_<page>.csv when occs_modified_after is given."""
+
+    root = FIXTURES
+    queries = None
+
+    def do_GET(self):
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        self.queries.append(query)
+        kind = 'delta' if 'occs_modified_after' in query else 'full'
+        page = os.path.join(self.root, f"{kind}_{int(query['offset']) // int(query['limit'])}.csv")
+        body = open(page, 'rb').read() if os.path.exists(page) else b''
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def pbdb_server():
+    handler = type('Handler', (PBDBStandIn,), {'queries': []})
+    server = HTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    handler.url = f"http://127.0.0.1:{server.server_port}/occs/list.csv"
+    yield handler
+    server.shutdown()
+    server.server_close()
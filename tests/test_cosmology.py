@@ -0,0 +1,41 @@
+import numpy as np
+
+from cosmic_history.cosmology import PLANCK15, Cosmology
+
+
+def analytic_age(cosmo, z):
+    # Flat matter + Λ: t = 2 / (3 H0 √ΩΛ) asinh(√(ΩΛ/Ωm) a^1.5)
+    a = 1 / (1 + np.asarray(z, dtype=float))
+    ode = 1 - cosmo.Om0
+    return 2 / (3 * np.sqrt(ode)) * cosmo.hubble_time() * np.arcsinh(np.sqrt(ode / cosmo.Om0) * a**1.5)
+
+
+def test_matter_lambda_ages_match_analytic():
+    cosmo = Cosmology(70.0, 0.3, Tcmb0=0)
+    z = np.concatenate([[0.0], np.logspace(-3, 4, 200)])
+    # 1e-8 at the table nodes; linear interpolation in ln a between them adds up to ~1e-7
+    np.testing.assert_allclose(cosmo.age(z), analytic_age(cosmo, z), rtol=1e-7)
+    np.testing.assert_allclose(cosmo.lookback_time(z), cosmo.age(0) - analytic_age(cosmo, z), atol=3e-6)
+
+
+def test_planck15_age_today():
+    # astropy's Planck15 gives 13.797 Gyr with a 0.06 eV neutrino; massless neutrinos add ~0.02 Gyr
+    assert abs(float(PLANCK15.age(0)) - 13.815) < 2e-3
+    assert PLANCK15.cmb_temperature(0) == 2.7255
+
+
+def test_round_trips():
+    z = np.logspace(-4, 6, 1000)
+    t = PLANCK15.age(z)
+    np.testing.assert_allclose(PLANCK15.redshift(t), z, rtol=1e-9)
+    np.testing.assert_allclose(PLANCK15.scale_factor(t), 1 / (1 + z), rtol=1e-9)
+    np.testing.assert_allclose(PLANCK15.cmb_temperature_at_age(t), PLANCK15.cmb_temperature(z), rtol=1e-9)
+    assert PLANCK15.scale_factor(0.0) == 0.0
+
+
+def test_dt_dz_is_the_analytic_age_derivative():
+    cosmo = Cosmology(70.0, 0.3, Tcmb0=0)
+    z = np.linspace(0.1, 8, 50)
+    h = 1e-4
+    numeric = (analytic_age(cosmo, z - h) - analytic_age(cosmo, z + h)) / (2 * h) * 1e9
+    np.testing.assert_allclose(cosmo.dt_dz(z), numeric, rtol=1e-6)
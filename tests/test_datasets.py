@@ -0,0 +1,18 @@
+import pandas as pd
+
+from cosmic_history.datasets import DatasetRegistry
+
+
+def frame(data_dir):
+    return pd.DataFrame({'age': [1.0, 2.0, 3.0], 'name': ['a', 'b', 'c']})
+
+
+def test_views_do_not_write_through(tmp_path):
+    registry = DatasetRegistry(str(tmp_path), loaders={'table': frame})
+    first = registry.get('table')
+    first.loc[0, 'age'] = -1.0
+    first['name'] = first['name'].str.upper()
+    first.fillna({'age': 0.0}, inplace=True)
+
+    pd.testing.assert_frame_equal(registry.get('table'), frame(None))
+    assert registry.loads == {'table': 1}
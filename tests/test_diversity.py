@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from cosmic_history.diversity import DiversityCurve, bin_edges
+
+
+def _occurrences(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Ages on a 0.5 Myr grid so plenty of ranges start or end exactly on a bin edge
+    min_ma = np.round(rng.uniform(0, 300, n) * 2) / 2
+    max_ma = min_ma + np.round(rng.exponential(8, n) * 2) / 2
+    min_ma[rng.random(n) < 0.03] = np.nan
+    taxa = rng.choice([f"taxon {i}" for i in range(60)], n)
+    return min_ma, max_ma, taxa
+
+
+def _brute_force(min_ma, max_ma, taxa, edges):
+    # A range touches a bin [e0, e1) when it starts inside it, or starts before e1 and ends after e0
+    valid = ~(np.isnan(min_ma) | np.isnan(max_ma))
+    lo, hi, taxa = min_ma[valid], max_ma[valid], taxa[valid]
+    occurrences, distinct = [], []
+    for e0, e1 in zip(edges[:-1], edges[1:]):
+        touch = ((e0 <= lo) & (lo < e1)) | ((lo < e1) & (hi > e0))
+        occurrences.append(touch.sum())
+        distinct.append(len(set(taxa[touch])))
+    return occurrences, distinct
+
+
+def test_curve_matches_brute_force():
+    min_ma, max_ma, taxa = _occurrences(3000)
+    curve = DiversityCurve(min_ma, max_ma, taxa)
+    for bins in (10.0, 7.5, np.array([0.0, 2.5, 66.0, 145.0, 201.5, 252.0, 400.0])):
+        table = curve.curve(bins)
+        edges = bin_edges(bins, np.nanmax(max_ma)) if np.ndim(bins) == 0 else bins
+        occurrences, distinct = _brute_force(min_ma, max_ma, taxa, edges)
+        np.testing.assert_array_equal(table['bin_min_ma'], edges[:-1])
+        np.testing.assert_array_equal(table['occurrences'], occurrences)
+        np.testing.assert_array_equal(table['taxa'], distinct)
+
+
+def test_categorical_taxa_and_sweep():
+    min_ma, max_ma, taxa = _occurrences(1000, seed=1)
+    plain = DiversityCurve(min_ma, max_ma, taxa)
+    categorical = DiversityCurve(min_ma, max_ma, pd.Series(taxa, dtype='category'))
+    swept = categorical.sweep([10.0, 20.0])
+    for width in (10.0, 20.0):
+        expected = plain.curve(width)
+        got = swept[swept['bin_width'] == width].drop(columns='bin_width').reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
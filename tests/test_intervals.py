@@ -0,0 +1,44 @@
+import numpy as np
+
+from cosmic_history.intervals import AgeIntervalIndex
+
+
+def _ranges(n, seed=0):
+    rng = np.random.default_rng(seed)
+    min_ma = np.round(rng.uniform(0, 540, n), 1)
+    max_ma = np.round(min_ma + rng.exponential(5, n), 1)
+    # Missing ages, and a few rows with the bounds the wrong way round
+    min_ma[rng.random(n) < 0.05] = np.nan
+    max_ma[rng.random(n) < 0.05] = np.nan
+    swap = rng.random(n) < 0.05
+    min_ma[swap], max_ma[swap] = max_ma[swap], min_ma[swap]
+    return min_ma, max_ma
+
+
+def _brute_force(min_ma, max_ma, start_ma, end_ma):
+    lo, hi = np.fmin(min_ma, max_ma), np.fmax(min_ma, max_ma)
+    w_lo, w_hi = min(start_ma, end_ma), max(start_ma, end_ma)
+    valid = ~(np.isnan(min_ma) | np.isnan(max_ma))
+    return np.flatnonzero(valid & (hi >= w_lo) & (lo <= w_hi))
+
+
+def test_count_and_query_match_brute_force():
+    min_ma, max_ma = _ranges(5000)
+    index = AgeIntervalIndex(min_ma, max_ma)
+    rng = np.random.default_rng(1)
+    starts = np.round(rng.uniform(0, 560, 200), 1)
+    ends = np.round(starts - rng.exponential(10, 200), 1)
+    # Reversed windows count the same as the right way round
+    ends[:20], starts[:20] = starts[:20], ends[:20]
+    expected = [_brute_force(min_ma, max_ma, s, e) for s, e in zip(starts, ends)]
+    np.testing.assert_array_equal(index.count(starts, ends), [len(rows) for rows in expected])
+    for rows, hits in zip(expected, index.query_many(starts, ends)):
+        np.testing.assert_array_equal(hits, rows)
+
+
+def test_windows_touching_a_range_endpoint_overlap():
+    index = AgeIntervalIndex([10.0, 20.0, np.nan], [15.0, 30.0, 40.0])
+    assert index.count(15.0, 15.0) == 1
+    assert index.count(20.0, 15.0) == 2
+    np.testing.assert_array_equal(index.query(40.0, 35.0), [])
+    np.testing.assert_array_equal(index.query(15.0, 20.0), [0, 1])
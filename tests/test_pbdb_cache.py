@@ -0,0 +1,21 @@
+import os
+
+from cosmic_history.pbdb_cache import OccurrenceCache
+
+CSV = 'occurrence_no,early_interval,max_ma,min_ma\n1,Frasnian,382.7,372.2\n2,Givetian,387.7,382.7\n'
+
+
+def test_same_size_edit_is_hashed_once(tmp_path):
+    path = tmp_path / 'pbdb_occurrences.csv'
+    path.write_text(CSV)
+    OccurrenceCache(str(path)).load(['early_interval'])
+
+    # Same size, new content and mtime: the hash has to decide, once
+    path.write_text(CSV.replace('Frasnian', 'Famennia'))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    cache = OccurrenceCache(str(path))
+    manifest = cache.validate()
+    assert manifest['columns'] == {}
+    assert cache.bytes_read == len(CSV)
+    assert cache.load(['early_interval'])['early_interval'].tolist() == ['Famennia', 'Givetian']
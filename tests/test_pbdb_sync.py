@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from cosmic_history.aggregate import stage_counts
+from cosmic_history.pbdb import read_occurrences
+from cosmic_history.pbdb_cache import OccurrenceCache
+from cosmic_history.pbdb_sync import sync_occurrences
+
+from tests.conftest import FIXTURES
+
+PAGE_ROWS = 3
+
+
+def fixture(name):
+    return pd.read_csv(os.path.join(FIXTURES, name), dtype=str, keep_default_na=False)
+
+
+def test_full_then_incremental_sync(tmp_path, pbdb_server):
+    url, queries = pbdb_server.url, pbdb_server.queries
+    path = str(tmp_path / 'pbdb_occurrences.csv')
+    state_path = str(tmp_path / 'pbdb_occurrences.sync.json')
+
+    full = sync_occurrences(path, base_url=url, page_rows=PAGE_ROWS)
+    assert full.full and len(full) == 5
+    expected = pd.concat([fixture('full_0.csv'), fixture('full_1.csv')], ignore_index=True)
+    pd.testing.assert_frame_equal(pd.read_csv(path, dtype=str, keep_default_na=False), expected)
+    with open(state_path) as f:
+        assert json.load(f) == {'last_modified': '2021-07-15 12:00:00', 'source': url}
+    assert [q['offset'] for q in queries] == ['0', '3']
+    assert all(q['limit'] == str(PAGE_ROWS) and 'occs_modified_after' not in q for q in queries)
+
+    # Warm the column cache, as a section run would, so the delta can patch it
+    columns = ['early_interval', 'max_ma', 'min_ma']
+    OccurrenceCache(path).load(columns)
+    before = stage_counts(read_occurrences(path)['early_interval'])
+
+    del queries[:]
+    delta = sync_occurrences(path, base_url=url, page_rows=PAGE_ROWS)
+    assert not delta.full and len(delta) == 2
+    assert queries == [{'max_ma': '10000', 'show': 'crmod', 'occs_modified_after': '2021-07-15 12:00:00',
+                        'limit': str(PAGE_ROWS), 'offset': '0'}]
+    # Untouched rows keep their order; replaced and new rows follow
+    merged = pd.concat([expected[expected['occurrence_no'] != '2'], fixture('delta_0.csv')], ignore_index=True)
+    pd.testing.assert_frame_equal(pd.read_csv(path, dtype=str, keep_default_na=False), merged)
+    with open(state_path) as f:
+        assert json.load(f)['last_modified'] == '2022-03-01 10:00:00'
+    assert delta.removed_intervals == ['Frasnian']
+    assert delta.affected_intervals == {'Frasnian', 'Givetian', 'Maastrichtian'}
+
+    after = stage_counts(read_occurrences(path)['early_interval'])
+    pd.testing.assert_series_equal(delta.apply_to_stage_counts(before), after, check_names=False)
+    assert delta.apply_to_stage_counts(before).to_dict() == {'Famennian': 2, 'Givetian': 1, 'Maastrichtian': 2}
+
+    # The sync patched the column cache (a reset would have dropped its columns),
+    # and the patched columns match a rebuild from the merged CSV
+    assert sorted(OccurrenceCache(path).validate()['columns']) == sorted(columns)
+    patched = OccurrenceCache(path).load(columns)
+    shutil.rmtree(tmp_path / '.pbdb_cache')
+    pd.testing.assert_frame_equal(patched, OccurrenceCache(path).load(columns))
+
+
+def test_empty_delta_keeps_store(tmp_path, pbdb_server):
+    # Serve the full export only, so the incremental request gets an empty body
+    root = tmp_path / 'pages'
+    root.mkdir()
+    for name in ('full_0.csv', 'full_1.csv'):
+        shutil.copy(os.path.join(FIXTURES, name), root)
+    pbdb_server.root = str(root)
+    path = str(tmp_path / 'pbdb_occurrences.csv')
+    sync_occurrences(path, base_url=pbdb_server.url, page_rows=PAGE_ROWS)
+    before = open(path).read()
+
+    result = sync_occurrences(path, base_url=pbdb_server.url, page_rows=PAGE_ROWS)
+    assert not result.full and len(result) == 0 and result.removed_intervals == []
+    assert open(path).read() == before
+    with open(tmp_path / 'pbdb_occurrences.sync.json') as f:
+        assert json.load(f)['last_modified'] == '2021-07-15 12:00:00'
@@ -0,0 +1,37 @@
+import argparse
+
+import matplotlib
+import pytest
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+
+from cosmic_history.render import finish_figure, parse_formats, set_batch_mode  # noqa: E402
+from cosmic_history.writer import WRITER  # noqa: E402
+
+
+def test_parse_formats():
+    assert parse_formats('svg, PDF,png@300,svg') == [('svg', None), ('pdf', None), ('png', 300)]
+    for bad in ('bmp', 'png', 'png@x', 'svg@0'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_formats(bad)
+
+
+@pytest.mark.parametrize('rc', [{}, {'savefig.dpi': 50, 'savefig.transparent': True},
+                                {'savefig.facecolor': 'black', 'savefig.bbox': 'tight'}])
+def test_chart_matches_savefig(tmp_path, rc):
+    set_batch_mode()
+
+    def draw():
+        plt.figure(figsize=(4, 3))
+        plt.plot([1, 3, 2])
+        plt.title('chart')
+
+    with plt.rc_context(rc):
+        draw()
+        finish_figure(str(tmp_path / 'chart.png'))
+        WRITER.flush()
+        draw()
+        plt.savefig(tmp_path / 'expected.png')
+        plt.close('all')
+    assert (tmp_path / 'chart.png').read_bytes() == (tmp_path / 'expected.png').read_bytes()
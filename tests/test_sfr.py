@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from cosmic_history.sfr import SFR_MODELS, comparison_table
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_comparison_table_matches_csv():
+    expected = pd.read_csv(os.path.join(REPO_DIR, 'sfr_comparison_data.csv'))
+    table = comparison_table()
+    assert list(table.columns) == list(expected.columns)
+    np.testing.assert_allclose(table.to_numpy(), expected.to_numpy(), rtol=1e-13, atol=0)
+
+
+def test_parameter_arrays_broadcast():
+    z = np.linspace(0, 8, 40)
+    model = SFR_MODELS['madau']
+    a = np.array([0.01, 0.015, 0.02])
+    batched = model(z, a=a)
+    assert batched.shape == (3, 40)
+    for row, value in zip(batched, a):
+        np.testing.assert_allclose(row, model(z, a=value), rtol=1e-15)
+
+
+def test_stellar_mass_density_matches_direct_integral():
+    model = SFR_MODELS['madau']
+    # Independent of the cached table: a finer grid and dt/dz written out for flat ΛCDM
+    z = np.linspace(0, 20, 200_001)
+    hubble = 70.0 / 3.0857e19 * np.sqrt(0.3 * (1 + z)**3 + 0.7)
+    integrand = model(z) / ((1 + z) * hubble) / 3.15576e7
+    rho0 = (1 - 0.27) * np.sum(0.5 * (integrand[1:] + integrand[:-1]) * np.diff(z))
+    np.testing.assert_allclose(model.stellar_mass_density(0.0), rho0, rtol=1e-6)
+    # ρ* only grows towards z = 0, and batched parameter sets match single ones
+    rho = model.stellar_mass_density(np.linspace(0, 10, 50))
+    assert np.all(np.diff(rho) <= 0)
+    batched = model.stellar_mass_density([0.0, 2.0], a=np.array([0.01, 0.02]))
+    np.testing.assert_allclose(batched[1], 2 * batched[0], rtol=1e-12)
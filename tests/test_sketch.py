@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cosmic_history.diversity import SketchedDiversity, diversity_curve, streamed_diversity_curve
+from cosmic_history.pbdb_cache import OccurrenceCache
+from cosmic_history.pbdb_sync import sync_occurrences
+from cosmic_history.sketch import GroupedSketches, HyperLogLog, load_stage_sketches, stage_diversity
+
+PRECISION = 12
+# Three standard errors of a 2**PRECISION-register sketch
+BOUND = 3 * 1.04 / np.sqrt(2**PRECISION)
+
+
+def names(start, stop):
+    return pd.Series([f'taxon {i}' for i in range(start, stop)])
+
+
+@pytest.mark.parametrize('n', [100, 5_000, 200_000])
+def test_count_within_error_bound(n):
+    sketch = HyperLogLog(PRECISION).add(pd.concat([names(0, n), names(0, n // 2)]))
+    assert abs(sketch.count() - n) <= BOUND * n
+
+
+def test_merge_matches_single_sketch():
+    a = HyperLogLog(PRECISION).add(names(0, 30_000))
+    b = HyperLogLog(PRECISION).add(names(20_000, 50_000))
+    whole = HyperLogLog(PRECISION).add(names(0, 50_000))
+    assert np.array_equal((a | b).registers, whole.registers)
+    assert (a | b).count() == whole.count()
+    assert abs(whole.count() - 50_000) <= BOUND * 50_000
+
+
+def test_grouped_merge_across_chunks():
+    groups = pd.Series(np.repeat(['Frasnian', 'Givetian', 'Maastrichtian'], 20_000))
+    values = names(0, 60_000)
+    whole = GroupedSketches(PRECISION).update(groups, values)
+    first = GroupedSketches(PRECISION).update(groups[:25_000], values[:25_000])
+    rest = GroupedSketches(PRECISION).update(groups[25_000:], values[25_000:])
+    merged = first.merge(rest)
+    pd.testing.assert_series_equal(merged.counts(), whole.counts())
+    assert (abs(whole.counts() - 20_000) <= BOUND * 20_000).all()
+
+
+def test_round_trips(tmp_path):
+    sketch = HyperLogLog(PRECISION).add(names(0, 1_000))
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.precision == PRECISION and np.array_equal(restored.registers, sketch.registers)
+
+    grouped = GroupedSketches(PRECISION).update(pd.Series(['a', 'b'] * 500), names(0, 1_000))
+    path = str(tmp_path / 'sketches.npz')
+    grouped.save(path)
+    loaded = GroupedSketches.load(path)
+    assert loaded.precision == PRECISION and loaded.labels == grouped.labels
+    assert np.array_equal(loaded.registers, grouped.registers)
+
+
+def test_rollup():
+    grouped = GroupedSketches(PRECISION).update(
+        pd.Series(['Frasnian', 'Givetian', 'Maastrichtian'] * 2), pd.Series(list('abcdbe')))
+    periods = grouped.rollup({'Frasnian': 'Devonian', 'Givetian': 'Devonian', 'Maastrichtian': 'Cretaceous'})
+    assert periods.counts().round().to_dict() == {'Cretaceous': 2.0, 'Devonian': 3.0}
+
+
+def occurrences(n=120_000, taxa=20_000, seed=1):
+    rng = np.random.default_rng(seed)
+    min_ma = rng.uniform(0, 500, n)
+    max_ma = min_ma + rng.exponential(5, n)
+    taxon = pd.Series(rng.integers(0, taxa, n)).astype(str).astype('category')
+    return min_ma, max_ma, taxon
+
+
+def test_approximate_curve_matches_exact():
+    min_ma, max_ma, taxa = occurrences()
+    exact = diversity_curve(min_ma, max_ma, taxa, bins=10.0)
+    approx = diversity_curve(min_ma, max_ma, taxa, bins=10.0, approximate=True, precision=PRECISION,
+                             chunksize=25_000)
+    pd.testing.assert_frame_equal(approx.drop(columns='taxa'), exact.drop(columns='taxa'))
+    assert (abs(approx['taxa'] - exact['taxa']) <= BOUND * exact['taxa'] + 1).all()
+
+
+def test_sketched_diversity_merge_and_edges():
+    min_ma, max_ma, taxa = occurrences(20_000, 3_000)
+    edges = np.arange(0, 551, 50.0)
+    whole = SketchedDiversity(edges, PRECISION).add(min_ma, max_ma, taxa)
+    young = min_ma < 200
+    parts = SketchedDiversity(edges, PRECISION).add(min_ma[young], max_ma[young], taxa[young])
+    parts.merge(SketchedDiversity(edges, PRECISION).add(min_ma[~young], max_ma[~young], taxa[~young]))
+    pd.testing.assert_frame_equal(parts.curve(), whole.curve())
+    assert np.array_equal(whole.curve()['bin_min_ma'], edges[:-1])
+
+
+def test_streamed_curve_and_stage_sketches(tmp_path):
+    min_ma, max_ma, taxa = occurrences(30_000, 4_000)
+    # Ages the CSV stores exactly, so the streamed bins match the in-memory ones
+    min_ma, max_ma = min_ma.round(3), max_ma.round(3)
+    stages = np.where(min_ma < 250, 'Maastrichtian', 'Frasnian')
+    path = str(tmp_path / 'pbdb_occurrences.csv')
+    pd.DataFrame({'accepted_name': taxa, 'early_interval': stages, 'max_ma': max_ma,
+                  'min_ma': min_ma}).to_csv(path, index=False)
+
+    in_memory = diversity_curve(min_ma, max_ma, taxa, approximate=True, precision=PRECISION)
+    streamed = streamed_diversity_curve(path, precision=PRECISION, chunksize=7_000)
+    pd.testing.assert_frame_equal(streamed, in_memory)
+
+    per_stage, per_period = stage_diversity(path, mapping={'Frasnian': 'Devonian', 'Maastrichtian': 'Cretaceous'},
+                                            precision=PRECISION)
+    exact = pd.Series(taxa.astype(str).to_numpy()).groupby(stages).nunique()
+    assert (abs(per_stage - exact) <= BOUND * exact).all()
+    assert per_period.index.tolist() == ['Cretaceous', 'Devonian']
+    # The second call reads the sketches saved in the column cache
+    pd.testing.assert_series_equal(load_stage_sketches(path, precision=PRECISION).counts(), per_stage)
+
+
+def test_sync_invalidates_stage_sketches(tmp_path, pbdb_server):
+    path = str(tmp_path / 'pbdb_occurrences.csv')
+    sync_occurrences(path, base_url=pbdb_server.url, page_rows=3)
+    # A warm column cache, so the incremental sync patches it rather than resetting it
+    OccurrenceCache(path).load(['early_interval'])
+    before, _ = stage_diversity(path, taxon='occurrence_no')
+    assert before.round().to_dict() == {'Famennian': 2.0, 'Frasnian': 1.0, 'Maastrichtian': 1.0}
+
+    sync_occurrences(path, base_url=pbdb_server.url, page_rows=3)
+    after, _ = stage_diversity(path, taxon='occurrence_no')
+    assert after.round().to_dict() == {'Famennian': 2.0, 'Givetian': 1.0, 'Maastrichtian': 2.0}
+    # The patched columns survived; only the stale sketches were dropped
+    assert list(OccurrenceCache(path).validate()['columns']) == ['early_interval']
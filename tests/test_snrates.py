@@ -0,0 +1,37 @@
+import numpy as np
+
+from cosmic_history.snrates import convolve, dtd_kernel, ia_rate, time_grid
+
+
+def test_fft_convolution_matches_np_convolve():
+    rng = np.random.default_rng(0)
+    history, kernel = rng.random((2, 1000))
+    expected = np.convolve(history, kernel)[:1000] * 0.01
+    result = convolve(history, kernel, 0.01)
+    np.testing.assert_allclose(result, expected, rtol=0, atol=1e-12 * expected.max())
+
+
+def test_batched_convolution_matches_each_row():
+    rng = np.random.default_rng(1)
+    history, kernels = rng.random(500), rng.random((4, 500))
+    batched = convolve(history, kernels, 1.0)
+    for row, kernel in zip(batched, kernels):
+        np.testing.assert_allclose(row, np.convolve(history, kernel)[:500], rtol=1e-12)
+
+
+def test_dtd_kernels_have_unit_integral():
+    t, _ = time_grid(1024)
+    for dtd in ('power_law', 'exponential', 'gaussian'):
+        kernel = dtd_kernel(dtd, 1024)
+        assert abs(kernel.sum() * (t[1] - t[0]) - 1) < 1e-12
+    kernels = dtd_kernel('power_law', 1024, beta=np.array([0.9, 1.1, 1.3]))
+    np.testing.assert_allclose(kernels.sum(axis=-1) * (t[1] - t[0]), 1, rtol=1e-12)
+
+
+def test_batched_beta_matches_individual_calls():
+    z = np.linspace(0, 6, 30)
+    betas = np.array([0.8, 1.1, 1.4])
+    batched = ia_rate(z, beta=betas)
+    assert batched.shape == (3, 30)
+    for row, beta in zip(batched, betas):
+        np.testing.assert_allclose(row, ia_rate(z, beta=beta), rtol=1e-12)
@@ -0,0 +1,59 @@
+import numpy as np
+
+from cosmic_history.uncertainty import StreamingQuantiles, lognormal, normal, propagate
+
+QS = (0.025, 0.16, 0.5, 0.84, 0.975)
+
+
+def _stream(values, chunk, **kw):
+    stream = StreamingQuantiles(QS, **kw)
+    for start in range(0, len(values), chunk):
+        stream.update(values[start:start + chunk])
+    return stream
+
+
+def test_streaming_quantiles_within_one_bin_of_np_quantile():
+    rng = np.random.default_rng(0)
+    values = rng.normal([0.0, 5.0, -3.0, 100.0], [1.0, 0.1, 4.0, 30.0], size=(50_000, 4))
+    values[rng.random(values.shape) < 0.01] = np.nan
+    stream = _stream(values, 4096)
+    width = (stream.high - stream.low) / stream.bins
+    result = stream.result()
+    for q in QS:
+        assert np.all(np.abs(result[q] - np.nanquantile(values, q, axis=0)) <= width)
+    np.testing.assert_allclose(stream.mean(), np.nanmean(values, axis=0), rtol=1e-12)
+    np.testing.assert_array_equal(stream.n, np.isfinite(values).sum(axis=0))
+
+
+def test_log_quantiles_within_one_bin_of_np_quantile():
+    rng = np.random.default_rng(1)
+    values = 10**rng.normal([-3.0, 2.0, 0.0], [0.5, 1.5, 0.05], size=(40_000, 3))
+    stream = _stream(values, 5000, log=True, bins=1024)
+    width = (stream.high - stream.low) / stream.bins
+    result = stream.result()
+    for q in QS:
+        assert np.all(np.abs(np.log10(result[q]) - np.log10(np.quantile(values, q, axis=0))) <= width)
+
+
+def test_propagate_matches_np_quantile_of_the_same_draws():
+    x = np.linspace(0, 5, 25)
+    sampler = lognormal({'a': 2.0}, 0.3)
+    sample_b = normal({'b': -0.5}, {'b': 0.1})
+
+    def draw(rng, n):
+        return {**sampler(rng, n), **sample_b(rng, n)}
+
+    def curve(x, p):
+        return p['a'][:, None] * np.exp(p['b'][:, None] * x)
+
+    band = propagate(curve, draw, x, draws=30_000, quantiles=QS, chunk=7000, seed=3)
+    # The same draws, all at once: propagate seeds default_rng and samples chunk by chunk
+    rng = np.random.default_rng(3)
+    values = np.concatenate([curve(x, draw(rng, n)) for n in (7000, 7000, 7000, 7000, 2000)])
+    # Each column's histogram spans at most twice the full range of its values
+    width = 2 * (values.max(axis=0) - values.min(axis=0)) / 2048
+    for q in QS:
+        assert np.all(np.abs(band.quantiles[q] - np.quantile(values, q, axis=0)) <= width)
+    np.testing.assert_allclose(band.mean, values.mean(axis=0), rtol=1e-12)
+    np.testing.assert_array_equal(band.lower, band.quantiles[0.025])
+    np.testing.assert_array_equal(band.median, band.quantiles[0.5])